@@ -1,14 +1,105 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
 from PyQt6.QtCore import QSettings
 from tmdbv3api import TMDb, TV
 
+
+@dataclass
+class ShowResult:
+    """The parts of a TMDB show search result the app uses"""
+    id: int
+    name: str
+
+
 class ApiClient:
+    _instance = None
+    # Lookups found in earlier sessions live next to the probe cache rather than in the settings,
+    # and only the most recent ones are kept so the file stays small
+    CACHE_FILE = Path.home() / ".cache" / "echomux" / "tmdb.json"
+    MAX_SAVED_SHOWS = 200
+    MAX_SAVED_TITLES = 5000
+
+    @classmethod
+    def instance(cls):
+        """Returns the client shared by the whole app, so its settings and caches are only loaded once"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         self.settings = QSettings("EchoMux", "EchoMux")
         self.tmdb = TMDb()
+        self.tv = TV()
+        self._has_key = False
+        # Lookups are cached for the lifetime of the client; a batch of episodes repeats the same show search
+        self._show_cache = {}
+        self._episode_title_cache = {}
+        # Set when a lookup found something that is not in the cache file yet
+        self._unsaved = False
+        # Lookups run on EpisodeTitleWorker and its thread pool; the lock covers the caches and the cache file
+        self._lock = threading.Lock()
+        self._load_cache()
         self._configure_api()
 
+        for legacy_key in ("show_cache", "episode_title_cache"):
+            # Earlier versions kept these caches in the settings, without a size limit
+            if self.settings.contains(legacy_key):
+                self.settings.remove(legacy_key)
+
+    def _load_cache(self):
+        """Seeds the caches with the shows and episode titles found in earlier sessions"""
+        try:
+            with open(self.CACHE_FILE, encoding='utf-8') as f:
+                saved = json.load(f)
+            for key, (show_id, name) in saved.get("shows", {}).items():
+                self._show_cache[key] = ShowResult(int(show_id), name)
+            for key, title in saved.get("episode_titles", {}).items():
+                show_id, season_number, episode_number = map(int, key.split("/"))
+                self._episode_title_cache[(show_id, season_number, episode_number)] = title
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+
+    def _save_cache(self):
+        """Writes the most recent shows and found titles to the cache file if anything was added"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            self._unsaved = False
+            # Newer entries were inserted later, so the tail of each dict is what is kept
+            shows = [(key, [show.id, show.name]) for key, show in self._show_cache.items() if show is not None]
+            titles = [(f"{show_id}/{season_number}/{episode_number}", title)
+                      for (show_id, season_number, episode_number), title in self._episode_title_cache.items()
+                      if title is not None]
+            saved = {
+                "shows": dict(shows[-self.MAX_SAVED_SHOWS:]),
+                "episode_titles": dict(titles[-self.MAX_SAVED_TITLES:]),
+            }
+            self._write_cache(saved)
+
+    def _write_cache(self, saved):
+        try:
+            self.CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.CACHE_FILE.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(saved, f)
+            os.replace(tmp_file, self.CACHE_FILE)
+        except (OSError, TypeError, ValueError):
+            # The cache only saves lookups; failing to write it must not fail the lookup
+            pass
+
+    @staticmethod
+    def _show_key(show_name):
+        # "breaking bad", " Breaking  Bad " and "Breaking Bad" are the same search
+        return " ".join(show_name.casefold().split())
+
     def _configure_api(self):
         api_key = self.settings.value("tmdb_api_key", "", type=str)
+        self._has_key = bool(api_key)
         if api_key:
             self.tmdb.api_key = api_key
             self.tmdb.language = 'en'
@@ -16,31 +107,69 @@ class ApiClient:
             return True
         return False
 
+    def reload_settings(self):
+        """Picks up an API key that was changed in the Settings tab"""
+        return self._configure_api()
+
     def is_configured(self):
-        return bool(self.tmdb.api_key)
+        return self._has_key
 
     def search_show(self, show_name):
         if not self.is_configured():
             return None
+        key = self._show_key(show_name)
+        if key in self._show_cache:
+            return self._show_cache[key]
         try:
-            tv = TV()
-            results = tv.search(show_name)
+            results = self.tv.search(show_name)
+            show = None
             if results:
-                return results[0]  # Return the most likely result
-            return None
+                # The first result is the most likely one
+                show = ShowResult(results[0].id, results[0].name)
+            with self._lock:
+                self._show_cache[key] = show
+                self._unsaved = self._unsaved or show is not None
         except Exception as e:
             print(f"Error searching for show '{show_name}': {e}")
             return None
+        self._save_cache()
+        return show
 
     def get_episode_title(self, show_id, season_number, episode_number):
+        title = self._fetch_episode_title(show_id, season_number, episode_number)
+        self._save_cache()
+        return title
+
+    def _fetch_episode_title(self, show_id, season_number, episode_number):
+        # Runs on get_episode_titles_bulk's pool threads; saving is left to the caller
         if not self.is_configured():
             return None
+        key = (show_id, season_number, episode_number)
+        if key in self._episode_title_cache:
+            return self._episode_title_cache[key]
         try:
-            tv = TV()
-            episode = tv.episode_details(show_id, season_number, episode_number)
-            if episode and 'name' in episode:
-                return episode['name']
-            return None
+            episode = self.tv.episode_details(show_id, season_number, episode_number)
+            title = episode['name'] if episode and 'name' in episode else None
+            with self._lock:
+                self._episode_title_cache[key] = title
+                # Missing episodes are only remembered for this session, since TMDB may add them later
+                self._unsaved = self._unsaved or title is not None
+            return title
         except Exception as e:
             print(f"Error getting episode title for S{season_number}E{episode_number}: {e}")
             return None
+
+    def get_episode_titles_bulk(self, show_id, episodes):
+        """
+        Looks up the titles of several (season, episode) pairs concurrently.
+        Returns a dict mapping each pair to its title, or None when it was not found.
+        """
+        unique_episodes = list(dict.fromkeys(episodes))
+        if not unique_episodes:
+            return {}
+        # The requests are network-bound, so threads overlap their latency
+        with ThreadPoolExecutor(max_workers=min(8, len(unique_episodes))) as executor:
+            titles = executor.map(lambda pair: self._fetch_episode_title(show_id, *pair), unique_episodes)
+            titles = dict(zip(unique_episodes, titles))
+        self._save_cache()
+        return titles
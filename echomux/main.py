@@ -1,34 +1,62 @@
-import subprocess
+import importlib.util
+import shutil
 import sys
 from pathlib import Path
 
+from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QApplication, QMessageBox
 
 from echomux.main_window import MainWindow
 from echomux.utils import get_ffmpeg_path
 
+ICON_PATH = Path(__file__).resolve().parent.parent / "icon" / "icon.ico"
+
 
 def check_dependencies():
     """Check if required dependencies are available"""
     missing = []
     ffmpeg_path = get_ffmpeg_path()
 
-    # Check FFmpeg
-    try:
-        subprocess.run([ffmpeg_path, '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Check FFmpeg; a PATH lookup is enough to know it is installed, no need to launch it
+    if shutil.which(ffmpeg_path) is None:
         missing.append(f"FFmpeg (path: {ffmpeg_path})")
 
-    # Check psutil (optional for system info)
-    try:
-        import psutil
-    except ImportError:
+    # Check psutil (optional for system info) without paying for its import
+    if importlib.util.find_spec("psutil") is None:
         missing.append("psutil (optional)")
 
     return missing
 
 
+class DependencyChecker(QThread):
+    """Runs check_dependencies in the background so the window appears without waiting on it"""
+    dependencies_checked = pyqtSignal(list)
+
+    def run(self):
+        self.dependencies_checked.emit(check_dependencies())
+
+
+def show_missing_dependencies(parent, missing_deps):
+    """Warn about missing dependencies, if there are any"""
+    if not missing_deps:
+        return
+
+    msg = QMessageBox(parent)
+    msg.setIcon(QMessageBox.Icon.Warning)
+    msg.setWindowTitle("Missing Dependencies")
+    msg.setText(f"Some dependencies are missing: {', '.join(missing_deps)}")
+
+    if any(dep.startswith("FFmpeg") for dep in missing_deps):
+        msg.setInformativeText("FFmpeg is required for media processing. "
+                             "Please install FFmpeg and make sure it's accessible from the command line.\n\n"
+                             "Other missing dependencies are optional but recommended.")
+    else:
+        msg.setInformativeText("These dependencies are optional but provide additional functionality.")
+
+    msg.exec()
+
+
 def main():
     app = QApplication(sys.argv)
     app.setApplicationName("EchoMux")
@@ -38,30 +66,17 @@ def main():
     app.setOrganizationDomain("echomux.app")
 
     # Set application icon
-    icon_path = Path(__file__).parent.parent / "icon" / "icon.ico"
-    if icon_path.exists():
-        app.setWindowIcon(QIcon(str(icon_path)))
-
-    # Check for dependencies
-    missing_deps = check_dependencies()
-    if missing_deps:
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Icon.Warning)
-        msg.setWindowTitle("Missing Dependencies")
-        msg.setText(f"Some dependencies are missing: {', '.join(missing_deps)}")
-
-        if "FFmpeg" in missing_deps:
-            msg.setInformativeText("FFmpeg is required for media processing. "
-                                 "Please install FFmpeg and make sure it's accessible from the command line.\n\n"
-                                 "Other missing dependencies are optional but recommended.")
-        else:
-            msg.setInformativeText("These dependencies are optional but provide additional functionality.")
-
-        msg.exec()
+    if ICON_PATH.is_file():
+        app.setWindowIcon(QIcon(str(ICON_PATH)))
 
     window = MainWindow()
     window.show()
 
+    # Check for dependencies once the window is up; the checker is parented to the window to keep it alive
+    checker = DependencyChecker(window)
+    checker.dependencies_checked.connect(lambda missing_deps: show_missing_dependencies(window, missing_deps))
+    checker.start()
+
     sys.exit(app.exec())
 
 
@@ -1,4 +1,4 @@
-from PyQt6.QtCore import Qt, QSettings
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QTabWidget, QApplication
 
@@ -8,12 +8,15 @@ from echomux.tabs.bulk_renaming_tab import BulkRenamingTab
 from echomux.tabs.settings_tab import SettingsTab
 from echomux.tabs.subtitle_embedding_tab import SubtitleEmbeddingTab
 from echomux.theme import LIGHT_STYLESHEET, DARK_STYLESHEET
+from echomux.ui_components import app_settings
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.settings = QSettings("EchoMux", "EchoMux")
+        self.settings = app_settings()
+        # The theme is read once; later changes arrive through SettingsTab.theme_changed
+        self._theme = self.settings.value("theme", "System", type=str)
         self.setWindowTitle("EchoMux - Media Toolkit")
 
         self.setup_ui()
@@ -40,6 +43,7 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(central_widget)
 
         self.header = QLabel("🎬 EchoMux - Media Toolkit")
+        self.header.setObjectName("AppHeader")
         self.header.setFont(QFont("Segoe UI", 16, QFont.Weight.Bold))
         self.header.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.header)
@@ -47,39 +51,59 @@ class MainWindow(QMainWindow):
         self.tab_widget = QTabWidget()
         self.tab_widget.setTabPosition(QTabWidget.TabPosition.North)
 
-        # Instantiate tabs
-        self.audio_extraction_tab = AudioExtractionTab()
-        self.audio_merging_tab = AudioMergingTab()
-        self.subtitle_embedding_tab = SubtitleEmbeddingTab()
-        self.bulk_renaming_tab = BulkRenamingTab()
-        self.settings_tab = SettingsTab()
-
-        # Add tabs
-        self.tab_widget.addTab(self.audio_extraction_tab, "🎵 Audio Extraction")
-        self.tab_widget.addTab(self.audio_merging_tab, "🔄 Audio Merging")
-        self.tab_widget.addTab(self.subtitle_embedding_tab, "📝 Subtitle Embedding")
-        self.tab_widget.addTab(self.bulk_renaming_tab, "🗃 Bulk Renaming")
-        self.tab_widget.addTab(self.settings_tab, "⚙️ Settings")
+        # Only the first tab is built up front; the others are built the first time they are opened
+        self._tab_factories = [
+            ("audio_extraction_tab", AudioExtractionTab, "🎵 Audio Extraction"),
+            ("audio_merging_tab", AudioMergingTab, "🔄 Audio Merging"),
+            ("subtitle_embedding_tab", SubtitleEmbeddingTab, "📝 Subtitle Embedding"),
+            ("bulk_renaming_tab", BulkRenamingTab, "🗃 Bulk Renaming"),
+            ("settings_tab", SettingsTab, "⚙️ Settings"),
+        ]
+        self._built_tabs = set()
+        for attr_name, _, title in self._tab_factories:
+            setattr(self, attr_name, None)
+            self.tab_widget.addTab(QWidget(), title)
+        self._ensure_tab(0)
+        self.tab_widget.currentChanged.connect(self._ensure_tab)
 
         layout.addWidget(self.tab_widget)
         self.statusBar().showMessage("Ready")
 
-        # Connect signals
-        self.settings_tab.theme_changed.connect(self.apply_theme)
+    def _ensure_tab(self, index: int):
+        """Replaces the placeholder at index with its real tab, if it hasn't been built yet."""
+        if index < 0 or index in self._built_tabs:
+            return
+        self._built_tabs.add(index)
+        attr_name, tab_class, title = self._tab_factories[index]
+        tab = tab_class()
+        setattr(self, attr_name, tab)
+        if isinstance(tab, SettingsTab):
+            tab.theme_changed.connect(self._on_theme_changed)
+
+        placeholder = self.tab_widget.widget(index)
+        # Swapping the page would otherwise report the neighbouring tab as current in between
+        self.tab_widget.blockSignals(True)
+        try:
+            self.tab_widget.removeTab(index)
+            self.tab_widget.insertTab(index, tab, title)
+            self.tab_widget.setCurrentIndex(index)
+        finally:
+            self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+
+    def _on_theme_changed(self, theme: str):
+        self._theme = theme
+        self.apply_theme()
 
     def apply_theme(self):
         """Applies the selected theme stylesheet to the application."""
-        theme = self.settings.value("theme", "System", type=str)
-
-        if theme == "Dark":
+        if self._theme == "Dark":
             stylesheet = DARK_STYLESHEET
         else: # Default to Light for "System" or "Light"
             stylesheet = LIGHT_STYLESHEET
 
-        QApplication.instance().setStyleSheet(stylesheet)
-
-        # Adjust header color based on theme
-        if theme == "Dark":
-            self.header.setStyleSheet("padding: 20px; color: #42A5F5;")
-        else:
-            self.header.setStyleSheet("padding: 20px; color: #1E88E5;")
+        # The header colour is part of each stylesheet, so one repolish covers the whole window,
+        # and re-selecting the current theme doesn't repolish at all
+        app = QApplication.instance()
+        if app.styleSheet() != stylesheet:
+            app.setStyleSheet(stylesheet)
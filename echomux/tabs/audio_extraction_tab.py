@@ -1,27 +1,30 @@
 from pathlib import Path
-from typing import List
-
-from pathlib import Path
-from typing import List
+from typing import List, Dict, Optional, Tuple
 
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QAction
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QProgressBar,
-    QFileDialog, QComboBox,
-    QGroupBox, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QGridLayout, QScrollArea, QMenu
+    QComboBox,
+    QGroupBox, QMessageBox, QTableWidget, QHeaderView, QGridLayout, QScrollArea
 )
 
-from echomux.ui_components import FileDropWidget, MaterialButton
-from echomux.utils import process_paths, analyze_media_file, open_file_location
-from echomux.worker import ProcessingJob, FFmpegWorker, MediaFile
+from echomux.ui_components import (
+    FileDropWidget, MaterialButton, get_open_file_names, get_existing_directory,
+    batch_table_update, selected_rows, read_only_item, file_table_menu, call_after_repaint,
+    MediaAnalysisMixin, JobRunnerMixin
+)
+from echomux.utils import process_paths, open_file_location, path_key, VIDEO_EXTENSIONS
+from echomux.worker import ProcessingJob, MediaFile
 
 
-class AudioExtractionTab(QWidget):
+class AudioExtractionTab(MediaAnalysisMixin, JobRunnerMixin, QWidget):
     def __init__(self):
         super().__init__()
         self.input_files = []
+        # Normalized paths of input_files, so duplicate checks don't scan the list
+        self._known_paths = set()
+        self._init_media_analysis()
         self.setup_ui()
 
     def setup_ui(self):
@@ -52,9 +55,10 @@ class AudioExtractionTab(QWidget):
         self.file_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.file_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.file_table.customContextMenuRequested.connect(self._show_context_menu)
+        self._file_menu = file_table_menu(self.file_table, self._remove_selected_files, self._open_selected_file_location)
 
-        self.drop_widget = FileDropWidget(allowed_extensions=['.mp4', '.mkv', '.avi', '.mov', '.m4v'])
-        self.drop_widget.files_dropped.connect(self.on_files_added)
+        self.drop_widget = FileDropWidget(allowed_extensions=VIDEO_EXTENSIONS)
+        self.drop_widget.files_dropped.connect(self.queue_media_analysis)
 
         drop_layout = QVBoxLayout(self.drop_widget)
         drop_layout.addWidget(self.file_table)
@@ -125,24 +129,16 @@ class AudioExtractionTab(QWidget):
         layout.addStretch()
 
     def _show_context_menu(self, position):
-        if not self.file_table.selectedItems():
+        if not self.file_table.selectionModel().hasSelection():
             return
 
-        menu = QMenu()
-        remove_action = menu.addAction("Remove Selected")
-        open_loc_action = menu.addAction("Open File Location")
-
-        action = menu.exec(self.file_table.mapToGlobal(position))
-
-        if action == remove_action:
-            self._remove_selected_files()
-        elif action == open_loc_action:
-            self._open_selected_file_location()
+        self._file_menu.exec(self.file_table.mapToGlobal(position))
 
     def _remove_selected_files(self):
-        selected_rows = sorted(list(set(item.row() for item in self.file_table.selectedItems())), reverse=True)
-        for row in selected_rows:
-            self.input_files.pop(row)
+        rows = selected_rows(self.file_table, reverse=True)
+        for row in rows:
+            removed = self.input_files.pop(row)
+            self._known_paths.discard(path_key(removed.path))
             self.file_table.removeRow(row)
 
         if self.file_table.rowCount() == 0:
@@ -150,36 +146,34 @@ class AudioExtractionTab(QWidget):
             self.file_table.setVisible(False)
 
     def _open_selected_file_location(self):
-        selected_rows = list(set(item.row() for item in self.file_table.selectedItems()))
-        if not selected_rows:
+        rows = selected_rows(self.file_table)
+        if not rows:
             return
         # Open location for the first selected item
-        file_to_open = self.input_files[selected_rows[0]]
+        file_to_open = self.input_files[rows[0]]
         open_file_location(str(file_to_open.path))
 
     def add_files(self):
-        files, _ = QFileDialog.getOpenFileNames(
-            self, "Select Video Files",
-            "", "Video Files (*.mp4 *.mkv *.avi *.mov *.m4v)"
-        )
+        files = get_open_file_names(self, "Select Video Files", "Video Files (*.mp4 *.mkv *.avi *.mov *.m4v)")
         if files:
-            self.on_files_added(files)
+            call_after_repaint(lambda: self.queue_media_analysis(files))
 
     def add_folder(self):
-        directory = QFileDialog.getExistingDirectory(self, "Select Folder")
+        directory = get_existing_directory(self, "Select Folder")
         if directory:
-            allowed_extensions = ['.mp4', '.mkv', '.avi', '.mov', '.m4v']
-            files = process_paths([directory], allowed_extensions)
-            self.on_files_added(files)
+            call_after_repaint(lambda: self.queue_media_analysis(process_paths([directory], VIDEO_EXTENSIONS)))
 
-    def on_files_added(self, files: List[str]):
-        for file_path in files:
-            if any(mf.path == Path(file_path) for mf in self.input_files):
+    def _add_analyzed_files(self, results: List[Tuple[str, Optional[Dict]]]):
+        new_rows = []
+        for file_path, info in results:
+            key = path_key(file_path)
+            if key in self._known_paths:
                 continue
+            self._known_paths.add(key)
 
-            media_file = MediaFile(Path(file_path), Path(file_path).name)
+            path = Path(file_path)
+            media_file = MediaFile(path, path.name)
 
-            info = analyze_media_file(file_path)
             duration_str = "N/A"
             audio_info_str = "Analysis Failed"
 
@@ -190,6 +184,7 @@ class AudioExtractionTab(QWidget):
                     media_file.duration = duration
 
                     audio_streams = [s for s in info.get('streams', []) if s.get('codec_type') == 'audio']
+                    media_file.audio_tracks = audio_streams
                     if not audio_streams:
                         audio_info_str = "⚠️ No Audio"
                     else:
@@ -199,25 +194,30 @@ class AudioExtractionTab(QWidget):
                     pass
 
             self.input_files.append(media_file)
+            new_rows.append((media_file.filename, duration_str, audio_info_str))
 
-            row_position = self.file_table.rowCount()
-            self.file_table.insertRow(row_position)
-            self.file_table.setItem(row_position, 0, QTableWidgetItem(media_file.filename))
-            self.file_table.setItem(row_position, 1, QTableWidgetItem(duration_str))
-            self.file_table.setItem(row_position, 2, QTableWidgetItem(audio_info_str))
+        # Grow the table once and fill it while it is frozen, instead of a relayout per row
+        with batch_table_update(self.file_table):
+            first_row = self.file_table.rowCount()
+            self.file_table.setRowCount(first_row + len(new_rows))
+            for row, cells in enumerate(new_rows, first_row):
+                for column, text in enumerate(cells):
+                    self.file_table.setItem(row, column, read_only_item(text))
 
         self.drop_widget.setVisible(self.file_table.rowCount() == 0)
         self.file_table.setVisible(self.file_table.rowCount() > 0)
 
 
     def clear_files(self):
+        self.cancel_media_analysis()
         self.file_table.setRowCount(0)
         self.input_files = []
+        self._known_paths.clear()
         self.drop_widget.setVisible(True)
         self.file_table.setVisible(False)
 
     def browse_output(self):
-        directory = QFileDialog.getExistingDirectory(self, "Select Output Directory")
+        directory = get_existing_directory(self, "Select Output Directory")
         if directory:
             self.output_path.setText(directory)
 
@@ -237,28 +237,4 @@ class AudioExtractionTab(QWidget):
             settings={'format': self.audio_format.currentText().lower()}
         )
 
-        self.worker = FFmpegWorker(job)
-        self.worker.progress_updated.connect(self.progress_bar.setValue)
-        self.worker.status_updated.connect(self.status_label.setText)
-        self.worker.job_completed.connect(self.on_job_completed)
-        self.cancel_btn.clicked.connect(self.worker.cancel)
-
-        self.extract_btn.setEnabled(False)
-        self.cancel_btn.setEnabled(True)
-        self.worker.start()
-
-    def on_job_completed(self, message, success):
-        # Disconnect the cancel signal to prevent issues on subsequent runs
-        try:
-            self.cancel_btn.clicked.disconnect(self.worker.cancel)
-        except TypeError: # Signal may already be disconnected
-            pass
-
-        self.extract_btn.setEnabled(True)
-        self.cancel_btn.setEnabled(False)
-        self.status_label.setText(message)
-
-        if success:
-            QMessageBox.information(self, "Success", message)
-        else:
-            QMessageBox.critical(self, "Error", message)
+        self._start_job(job, self.extract_btn)
@@ -1,30 +1,47 @@
-import re
+import os
 from pathlib import Path
 from typing import List
 
-from PyQt6.QtCore import Qt, QSettings
-from PyQt6.QtGui import QAction
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QProgressBar,
-    QFileDialog, QCheckBox,
+    QCheckBox,
     QGroupBox, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QGridLayout, QScrollArea,
-    QComboBox, QPushButton, QMenu, QInputDialog, QApplication
+    QComboBox, QPushButton, QMenu, QInputDialog
 )
 
-from echomux.ui_components import QTableWidgetWithDrop, MaterialButton
-from echomux.utils import process_paths, extract_season_episode, open_file_location
-from echomux.worker import ProcessingJob, FFmpegWorker, MediaFile
-from echomux.api_client import ApiClient
+from echomux.ui_components import (
+    QTableWidgetWithDrop, MaterialButton, get_open_file_names, get_existing_directory,
+    batch_table_update, selected_rows, app_settings, call_after_repaint, JobRunnerMixin
+)
+from echomux.utils import (
+    process_paths, extract_season_episode, open_file_location, clean_show_name, sanitize_filename_part, path_key,
+    VIDEO_EXTENSIONS, AUDIO_EXTENSIONS, SUBTITLE_EXTENSIONS
+)
+from echomux.worker import ProcessingJob, MediaFile, EpisodeTitleWorker
 
+RENAMEABLE_EXTENSIONS = VIDEO_EXTENSIONS | AUDIO_EXTENSIONS | SUBTITLE_EXTENSIONS
 
-class BulkRenamingTab(QWidget):
+
+class BulkRenamingTab(JobRunnerMixin, QWidget):
     def __init__(self):
         super().__init__()
         self.media_files = []
+        self._file_paths = set() # path_key() of every entry in media_files
         self.preview_data = []
-        self.api_client = ApiClient()
-        self.show_search_cache = {}
+        self._rendered_rows = [] # (current name, new name) of each row the preview table shows
+        # Created on first use; importing tmdbv3api alone takes tens of milliseconds at startup
+        self._api_client = None
+        # Episode titles are fetched off the UI thread; the preview is refreshed as they arrive
+        self._title_worker = None
+        self._episode_titles = {} # (show name, season, episode) -> title, or None when not found
+        self._requested_titles = set() # (show name, season, episode) of every lookup started
+        # Collapses bursts of keystrokes into a single preview rebuild
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.timeout.connect(self.update_preview)
         self.setup_ui()
 
     def setup_ui(self):
@@ -41,12 +58,7 @@ class BulkRenamingTab(QWidget):
         input_group = QGroupBox("Media Files")
         input_layout = QVBoxLayout(input_group)
 
-        allowed_extensions = [
-            '.mp4', '.mkv', '.avi', '.mov', '.m4v',
-            '.mp3', '.flac', '.aac', '.ogg', '.wav', '.m4a',
-            '.srt', '.ass', '.vtt', '.sub'
-        ]
-        self.preview_table = QTableWidgetWithDrop(allowed_extensions=allowed_extensions)
+        self.preview_table = QTableWidgetWithDrop(allowed_extensions=RENAMEABLE_EXTENSIONS)
         self.preview_table.files_dropped.connect(self.on_files_added)
         self.preview_table.setColumnCount(3)
         self.preview_table.setHorizontalHeaderLabels(["Current Name", "→", "New Name"])
@@ -57,6 +69,7 @@ class BulkRenamingTab(QWidget):
         self.preview_table.setMinimumHeight(200)
         self.preview_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.preview_table.customContextMenuRequested.connect(self.show_context_menu)
+        self._build_context_menu()
         input_layout.addWidget(self.preview_table)
 
         button_layout = QHBoxLayout()
@@ -79,7 +92,7 @@ class BulkRenamingTab(QWidget):
         settings_layout.addWidget(QLabel("Series/Movie Name:"), 0, 0)
         self.show_name = QLineEdit()
         self.show_name.setPlaceholderText("Enter Series or Movie Name...")
-        self.show_name.textChanged.connect(self.update_preview)
+        self.show_name.textChanged.connect(self.schedule_preview)
         settings_layout.addWidget(self.show_name, 0, 1, 1, 2)
         settings_layout.addWidget(QLabel("Template Presets:"), 1, 0)
         self.template_presets = QComboBox()
@@ -88,10 +101,10 @@ class BulkRenamingTab(QWidget):
         settings_layout.addWidget(self.template_presets, 1, 1, 1, 2)
         settings_layout.addWidget(QLabel("Filename Template:"), 2, 0)
         self.filename_template = QLineEdit()
-        settings = QSettings("EchoMux", "EchoMux")
+        settings = app_settings()
         default_template = "{name} - S{season:02d}E{episode:02d} - {title}{ext}"
         self.filename_template.setText(settings.value("rename_template", default_template, type=str))
-        self.filename_template.textChanged.connect(self.update_preview)
+        self.filename_template.textChanged.connect(self.schedule_preview)
         settings_layout.addWidget(self.filename_template, 2, 1, 1, 2)
         token_layout = QHBoxLayout()
         tokens = ["{name}", "{season:02d}", "{episode:02d}", "{title}", "{ext}", "{year}"]
@@ -102,7 +115,7 @@ class BulkRenamingTab(QWidget):
         token_layout.addStretch()
         settings_layout.addLayout(token_layout, 3, 1, 1, 2)
         self.use_api = QCheckBox("Fetch episode titles from The Movie Database")
-        self.use_api.stateChanged.connect(self.update_preview)
+        self.use_api.stateChanged.connect(self.schedule_preview)
         settings_layout.addWidget(self.use_api, 4, 0, 1, 3)
         self.preview_mode = QCheckBox("Preview mode (don't actually rename files)")
         self.preview_mode.setChecked(True)
@@ -136,8 +149,20 @@ class BulkRenamingTab(QWidget):
         super().showEvent(event)
         self.check_api_status()
 
+    @property
+    def api_client(self):
+        if self._api_client is None:
+            from echomux.api_client import ApiClient
+            self._api_client = ApiClient.instance()
+        return self._api_client
+
     def check_api_status(self):
-        if self.api_client.is_configured():
+        if self._api_client is not None:
+            has_key = self._api_client.reload_settings()
+        else:
+            # Until titles are actually fetched, the client is not needed to know whether a key is set
+            has_key = bool(app_settings().value("tmdb_api_key", "", type=str))
+        if has_key:
             self.use_api.setEnabled(True)
             self.use_api.setToolTip("Fetch episode titles using the configured TMDB API key.")
         else:
@@ -145,27 +170,32 @@ class BulkRenamingTab(QWidget):
             self.use_api.setToolTip("Please set your TMDB API key in the Settings tab to use this feature.")
 
     def add_files(self):
-        files, _ = QFileDialog.getOpenFileNames(
-            self, "Select Media Files", "", "Media Files (*.mp4 *.mkv *.avi *.mov *.m4v *.mp3 *.flac *.srt *.ass)"
-        )
+        files = get_open_file_names(self, "Select Media Files", "Media Files (*.mp4 *.mkv *.avi *.mov *.m4v *.mp3 *.flac *.srt *.ass)")
         if files:
-            self.on_files_added(files)
+            call_after_repaint(lambda: self.on_files_added(files))
 
     def add_folder(self):
-        directory = QFileDialog.getExistingDirectory(self, "Select Folder")
+        directory = get_existing_directory(self, "Select Folder")
         if directory:
-            self.on_files_added(process_paths([directory], self.preview_table.allowed_extensions))
+            call_after_repaint(lambda: self.on_files_added(
+                process_paths([directory], self.preview_table.allowed_extensions)
+            ))
 
     def on_files_added(self, files: List[str]):
         for file_path in files:
-            if any(mf.path == Path(file_path) for mf in self.media_files):
+            key = path_key(file_path)
+            if key in self._file_paths:
                 continue
-            media_file = MediaFile(Path(file_path), Path(file_path).name)
-            self.media_files.append(media_file)
+            self._file_paths.add(key)
+            path = Path(file_path)
+            self.media_files.append(MediaFile(path, path.name))
         self.update_preview()
 
     def clear_files(self):
         self.media_files = []
+        self._file_paths.clear()
+        self._episode_titles.clear()
+        self._requested_titles.clear()
         self.update_preview()
 
     def on_preset_changed(self, index):
@@ -177,111 +207,167 @@ class BulkRenamingTab(QWidget):
     def insert_token(self, token):
         self.filename_template.insert(token)
 
+    def _build_context_menu(self):
+        # Built once; right-clicks only show it
+        self._context_menu = QMenu(self.preview_table)
+        self._context_menu.addAction("Open File Location").triggered.connect(self._open_selected_file_location)
+        self._context_menu.addSeparator()
+        self._context_menu.addAction("Remove Selected").triggered.connect(self._remove_selected_files)
+        self._context_menu.addSeparator()
+        self._context_menu.addAction("Find & Replace in Filenames...").triggered.connect(self.handle_find_replace)
+        self._context_menu.addAction("Add Prefix...").triggered.connect(lambda: self.handle_add_prefix_suffix(is_prefix=True))
+        self._context_menu.addAction("Add Suffix...").triggered.connect(lambda: self.handle_add_prefix_suffix(is_prefix=False))
+
     def show_context_menu(self, position):
-        if not self.preview_table.selectedItems():
+        if not self.preview_table.selectionModel().hasSelection():
             return
 
-        menu = QMenu()
-
-        open_loc_action = menu.addAction("Open File Location")
-        menu.addSeparator()
-        remove_action = menu.addAction("Remove Selected")
-        menu.addSeparator()
-        find_replace_action = menu.addAction("Find & Replace in Filenames...")
-        add_prefix_action = menu.addAction("Add Prefix...")
-        add_suffix_action = menu.addAction("Add Suffix...")
-
-        action = menu.exec(self.preview_table.mapToGlobal(position))
-
-        if action == remove_action:
-            self._remove_selected_files()
-        elif action == open_loc_action:
-            self._open_selected_file_location()
-        elif action == find_replace_action:
-            self.handle_find_replace()
-        elif action == add_prefix_action:
-            self.handle_add_prefix_suffix(is_prefix=True)
-        elif action == add_suffix_action:
-            self.handle_add_prefix_suffix(is_prefix=False)
+        self._context_menu.exec(self.preview_table.mapToGlobal(position))
 
     def _remove_selected_files(self):
-        selected_rows = sorted(list(set(item.row() for item in self.preview_table.selectedItems())), reverse=True)
-        for row in selected_rows:
-            self.media_files.pop(row)
+        rows = selected_rows(self.preview_table, reverse=True)
+        for row in rows:
+            self._file_paths.discard(path_key(self.media_files.pop(row).path))
         self.update_preview()
 
     def _open_selected_file_location(self):
-        selected_rows = list(set(item.row() for item in self.preview_table.selectedItems()))
-        if not selected_rows:
+        rows = selected_rows(self.preview_table)
+        if not rows:
             return
-        file_to_open = self.media_files[selected_rows[0]]
+        file_to_open = self.media_files[rows[0]]
         open_file_location(str(file_to_open.path))
 
     def handle_find_replace(self):
         find_text, ok1 = QInputDialog.getText(self, 'Find & Replace', 'Text to find:')
         if not (ok1 and find_text): return
         replace_text, ok2 = QInputDialog.getText(self, 'Find & Replace', f'Replace "{find_text}" with:')
-        if not ok2: return
+        if not ok2 or replace_text == find_text: return
+        changed = False
         for media_file in self.media_files:
-            media_file.filename = media_file.filename.replace(find_text, replace_text)
-        self.update_preview()
+            if find_text in media_file.filename:
+                media_file.filename = media_file.filename.replace(find_text, replace_text)
+                changed = True
+        if changed:
+            self.update_preview()
 
     def handle_add_prefix_suffix(self, is_prefix=True):
         title = "Add Prefix" if is_prefix else "Add Suffix"
         text, ok = QInputDialog.getText(self, title, f'{title}:')
         if not (ok and text): return
         for media_file in self.media_files:
-            p = Path(media_file.filename)
-            new_stem = text + p.stem if is_prefix else p.stem + text
-            media_file.filename = new_stem + p.suffix
+            stem, suffix = os.path.splitext(media_file.filename)
+            new_stem = text + stem if is_prefix else stem + text
+            media_file.filename = new_stem + suffix
         self.update_preview()
 
+    def schedule_preview(self, *_):
+        # QTimer.start() restarts a running timer, so only the last change in a burst triggers a rebuild
+        self._preview_timer.start()
+
     def update_preview(self):
-        self.preview_table.setRowCount(0)
+        self._preview_timer.stop()
+        rows = self._compute_preview_rows()
+
+        if len(rows) == len(self._rendered_rows):
+            # Same files as the table already shows, so only the cells whose text changed are touched
+            with batch_table_update(self.preview_table):
+                for i, ((filename, new_name), (old_filename, old_new_name)) in enumerate(zip(rows, self._rendered_rows)):
+                    if filename != old_filename:
+                        self.preview_table.item(i, 0).setText(filename)
+                    if new_name != old_new_name:
+                        self.preview_table.item(i, 2).setText(new_name)
+        else:
+            header = self.preview_table.horizontalHeader()
+            # Rebuild the table in one go: no repaints, sorting or item signals until every row is set,
+            # and no per-item content measuring for the arrow column
+            with batch_table_update(self.preview_table):
+                header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
+                try:
+                    self._fill_preview_table(rows)
+                finally:
+                    header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        self._rendered_rows = rows
+
+    def _compute_preview_rows(self):
+        """
+        Works out the new name of every media file and refreshes preview_data.
+        Returns one (current name, new name) pair per row of the preview table.
+        """
+        self.preview_data = []
         if not self.media_files:
-            return
+            return []
 
-        self.preview_table.setRowCount(len(self.media_files))
-        self.preview_data = []
         show_name = self.show_name.text().strip()
 
-        show = None
+        episodes = [extract_season_episode(media_file.filename) if show_name else (None, None)
+                    for media_file in self.media_files]
+
+        episode_titles = {}
         if show_name and self.use_api.isChecked() and self.api_client.is_configured():
-            if show_name in self.show_search_cache:
-                show = self.show_search_cache[show_name]
-            else:
-                show = self.api_client.search_show(show_name)
-                self.show_search_cache[show_name] = show
-
-        for i, media_file in enumerate(self.media_files):
-            self.preview_table.setItem(i, 0, QTableWidgetItem(media_file.filename))
-            self.preview_table.setItem(i, 1, QTableWidgetItem("→"))
+            episode_titles = self._lookup_episode_titles(
+                show_name, [(season, episode) for season, episode in episodes if season and episode]
+            )
+
+        rows = []
+        for media_file, (season, episode) in zip(self.media_files, episodes):
             new_name = ""
             if show_name:
-                season, episode = extract_season_episode(media_file.filename)
                 if season and episode:
                     episode_title = ""
-                    if show:
-                        QApplication.processEvents() # Keep UI responsive during API calls
-                        title = self.api_client.get_episode_title(show.id, season, episode)
-                        episode_title = title if title else "Episode Not Found"
+                    if (season, episode) in episode_titles:
+                        episode_title = episode_titles[(season, episode)] or "Episode Not Found"
 
-                    new_name = self.build_new_filename(show_name, season, episode, episode_title, Path(media_file.filename).suffix)
+                    new_name = self.build_new_filename(show_name, season, episode, episode_title, os.path.splitext(media_file.filename)[1])
                 else:
                     new_name = "⚠️ Could not parse S/E"
-            self.preview_table.setItem(i, 2, QTableWidgetItem(new_name))
+            rows.append((media_file.filename, new_name))
             self.preview_data.append({
                 'original': media_file,
                 'new_name': new_name,
                 'valid': bool(new_name and "⚠️" not in new_name and "Not Found" not in new_name)
             })
+        return rows
+
+    def _lookup_episode_titles(self, show_name, episodes):
+        """
+        Returns the titles fetched so far for the given (season, episode) pairs of a show,
+        and starts fetching the ones that were never requested.
+        """
+        missing = [pair for pair in dict.fromkeys(episodes) if (show_name, *pair) not in self._requested_titles]
+        if missing and self._title_worker is None:
+            self._requested_titles.update((show_name, *pair) for pair in missing)
+            self.status_label.setText("Fetching episode titles...")
+            self._title_worker = EpisodeTitleWorker(self.api_client, show_name, missing, self)
+            self._title_worker.titles_ready.connect(self._on_titles_ready)
+            self._title_worker.finished.connect(self._on_title_worker_finished)
+            self._title_worker.start()
+
+        return {pair: self._episode_titles[(show_name, *pair)]
+                for pair in episodes if (show_name, *pair) in self._episode_titles}
+
+    def _on_titles_ready(self, show_name, titles):
+        for pair, title in titles.items():
+            self._episode_titles[(show_name, *pair)] = title
+
+    def _on_title_worker_finished(self):
+        self._title_worker.deleteLater()
+        self._title_worker = None
+        self.status_label.setText("Ready to rename files")
+        # Shows the new titles, and requests whatever the user asked for while this lookup ran
+        self.update_preview()
+
+    def _fill_preview_table(self, rows):
+        self.preview_table.setRowCount(0)
+        self.preview_table.setRowCount(len(rows))
+        for i, (filename, new_name) in enumerate(rows):
+            self.preview_table.setItem(i, 0, QTableWidgetItem(filename))
+            self.preview_table.setItem(i, 1, QTableWidgetItem("→"))
+            self.preview_table.setItem(i, 2, QTableWidgetItem(new_name))
 
     def build_new_filename(self, show_name, season, episode, episode_title, extension):
         template = self.filename_template.text()
-        clean_name = re.sub(r'[<>:"/\\|?*]', '', show_name)
-        clean_title = re.sub(r'[<>:"/\\|?*]', '', episode_title) if episode_title else ''
-        year_match = re.search(r'\((\d{4})\)', clean_name)
-        year = year_match.group(1) if year_match else ""
+        clean_name, year = clean_show_name(show_name)
+        clean_title = sanitize_filename_part(episode_title) if episode_title else ''
 
         try:
             return template.format(name=clean_name, season=season, episode=episode, title=clean_title, ext=extension, year=year)
@@ -295,21 +381,21 @@ class BulkRenamingTab(QWidget):
         if not self.show_name.text().strip():
             QMessageBox.warning(self, "Warning", "Please enter a show name.")
             return
+        if self._preview_timer.isActive():
+            # The last edit has not been previewed yet
+            self.update_preview()
+        if self._title_worker is not None:
+            QMessageBox.information(self, "Please Wait", "Episode titles are still being fetched. Try again in a moment.")
+            return
         valid_count = sum(1 for item in self.preview_data if item['valid'])
         if valid_count == 0:
             QMessageBox.warning(self, "Warning", "No files have valid season/episode information.")
             return
 
         if not self.preview_mode.isChecked():
-            overwrites = []
-            for item in self.preview_data:
-                if not item['valid']: continue
-                original_path = item['original'].path
-                new_path = original_path.parent / item['new_name']
-                if new_path.exists() and new_path != original_path:
-                    overwrites.append(item['new_name'])
+            overwrites = self._find_overwrites()
             if overwrites:
-                msg = f"The following files already exist and will be overwritten:\n\n" + "\\n".join(overwrites[:5])
+                msg = f"The following files already exist and will be overwritten:\n\n" + "\n".join(overwrites[:5])
                 if len(overwrites) > 5: msg += f"\n...and {len(overwrites) - 5} more."
                 msg += "\n\nDo you want to continue?"
                 reply = QMessageBox.warning(self, "Overwrite Warning", msg, QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
@@ -320,24 +406,32 @@ class BulkRenamingTab(QWidget):
         if reply != QMessageBox.StandardButton.Yes: return
 
         job = ProcessingJob(input_files=self.media_files, output_directory=Path(), job_type='rename', settings={'show_name': self.show_name.text().strip(),'filename_template': self.filename_template.text(),'use_api': self.use_api.isChecked(),'preview_mode': self.preview_mode.isChecked()})
-        self.worker = FFmpegWorker(job)
-        self.worker.progress_updated.connect(self.progress_bar.setValue)
-        self.worker.status_updated.connect(self.status_label.setText)
-        self.worker.job_completed.connect(self.on_job_completed)
-        self.cancel_btn.clicked.connect(self.worker.cancel)
-
-        self.rename_btn.setEnabled(False)
-        self.cancel_btn.setEnabled(True)
-        self.worker.start()
+        self._start_job(job, self.rename_btn)
+
+    def _find_overwrites(self):
+        """
+        Returns the new names in the preview that already belong to another file.
+        Each folder is listed once rather than checking every new name on disk.
+        """
+        # normcase folds case only on Windows, where names differing in case are the same file
+        names_by_folder = {}
+        overwrites = []
+        for item in self.preview_data:
+            if not item['valid']:
+                continue
+            folder, original_name = os.path.split(item['original'].path)
+            if folder not in names_by_folder:
+                try:
+                    with os.scandir(folder or '.') as entries:
+                        names_by_folder[folder] = {os.path.normcase(entry.name) for entry in entries}
+                except OSError:
+                    names_by_folder[folder] = set()
+            new_name = os.path.normcase(item['new_name'])
+            if new_name in names_by_folder[folder] and new_name != os.path.normcase(original_name):
+                overwrites.append(item['new_name'])
+        return overwrites
 
     def on_job_completed(self, message, success):
-        try:
-            self.cancel_btn.clicked.disconnect(self.worker.cancel)
-        except TypeError:
-            pass
-
-        self.rename_btn.setEnabled(True)
-        self.cancel_btn.setEnabled(False)
         self.status_label.setText(message)
         if success and not self.preview_mode.isChecked():
             self.clear_files()
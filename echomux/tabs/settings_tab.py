@@ -1,18 +1,20 @@
-from PyQt6.QtCore import Qt, QSettings, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QBrush, QPalette
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QGroupBox, QGridLayout, QLabel, QLineEdit,
-    QPushButton, QHBoxLayout, QComboBox, QMessageBox, QListWidget, QInputDialog, QListWidgetItem
+    QPushButton, QHBoxLayout, QComboBox, QMessageBox, QListWidget, QInputDialog, QListWidgetItem,
+    QSpinBox
 )
 
 from echomux.utils import get_languages, add_language, remove_language, DEFAULT_LANGUAGES
-from echomux.ui_components import MaterialButton
+from echomux.ui_components import MaterialButton, app_settings
 
 class SettingsTab(QWidget):
-    theme_changed = pyqtSignal()
+    theme_changed = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
-        self.settings = QSettings("EchoMux", "EchoMux")
+        self.settings = app_settings()
         self.setup_ui()
 
     def setup_ui(self):
@@ -34,6 +36,11 @@ class SettingsTab(QWidget):
         self.ffmpeg_path_edit = QLineEdit()
         self.ffmpeg_path_edit.setPlaceholderText("e.g., C:/ffmpeg/bin/ffmpeg.exe or /usr/bin/ffmpeg")
         general_layout.addWidget(self.ffmpeg_path_edit, 0, 1)
+        general_layout.addWidget(QLabel("Parallel FFmpeg Jobs:"), 1, 0)
+        self.max_threads_spin = QSpinBox()
+        self.max_threads_spin.setRange(1, 64)
+        self.max_threads_spin.setToolTip("Number of files processed at the same time.")
+        general_layout.addWidget(self.max_threads_spin, 1, 1)
         layout.addWidget(general_group)
 
         # Renaming settings
@@ -58,6 +65,7 @@ class SettingsTab(QWidget):
         lang_group = QGroupBox("Custom Language Management")
         lang_layout = QVBoxLayout(lang_group)
         self.lang_list_widget = QListWidget()
+        self.lang_list_widget.setUniformItemSizes(True)
         lang_layout.addWidget(self.lang_list_widget)
         lang_button_layout = QHBoxLayout()
         self.add_lang_btn = MaterialButton("Add Language")
@@ -88,18 +96,22 @@ class SettingsTab(QWidget):
     def populate_language_list(self):
         self.lang_list_widget.clear()
         self.languages = get_languages()
+        default_codes = {c[1] for c in DEFAULT_LANGUAGES}
+        # Built-in languages share one greyed-out brush instead of a palette lookup per row
+        disabled_brush = QBrush(self.palette().color(QPalette.ColorGroup.Disabled, QPalette.ColorRole.WindowText))
         for name, code in self.languages:
             item = QListWidgetItem(f"{name} ({code})")
             item.setData(Qt.ItemDataRole.UserRole, code)
-            if not any(c[1] == code for c in DEFAULT_LANGUAGES):
+            if code not in default_codes:
                 item.setFlags(item.flags() | Qt.ItemFlag.ItemIsSelectable)
             else:
                 item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-                item.setForeground(self.palette().color(self.palette().ColorGroup.Disabled, self.palette().ColorRole.WindowText))
+                item.setForeground(disabled_brush)
             self.lang_list_widget.addItem(item)
 
     def load_settings(self):
         self.ffmpeg_path_edit.setText(self.settings.value("ffmpeg_path", "", type=str))
+        self.max_threads_spin.setValue(self.settings.value("max_threads", QThread.idealThreadCount(), type=int))
         default_template = "{name} - S{season:02d}E{episode:02d} - {title}{ext}"
         self.rename_template_edit.setText(self.settings.value("rename_template", default_template, type=str))
         self.tmdb_api_key_edit.setText(self.settings.value("tmdb_api_key", "", type=str))
@@ -109,14 +121,15 @@ class SettingsTab(QWidget):
 
     def save_settings(self):
         self.settings.setValue("ffmpeg_path", self.ffmpeg_path_edit.text())
+        self.settings.setValue("max_threads", self.max_threads_spin.value())
         self.settings.setValue("rename_template", self.rename_template_edit.text())
         self.settings.setValue("theme", self.theme_combo.currentText())
         self.settings.setValue("tmdb_api_key", self.tmdb_api_key_edit.text())
         QMessageBox.information(self, "Settings Saved", "Your settings have been saved.")
 
     def on_theme_changed(self, theme_name: str):
-        self.settings.setValue("theme", self.theme_combo.currentText())
-        self.theme_changed.emit()
+        self.settings.setValue("theme", theme_name)
+        self.theme_changed.emit(theme_name)
 
     def add_new_language(self):
         name, ok1 = QInputDialog.getText(self, 'Add Custom Language', 'Enter full language name (e.g., German):')
@@ -1,27 +1,35 @@
+import os
 from pathlib import Path
-from typing import List
-
-from pathlib import Path
-from typing import List
+from typing import List, Dict, Optional, Tuple
 
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QAction
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QProgressBar,
-    QFileDialog, QCheckBox, QComboBox, QGroupBox, QMessageBox, QTextEdit,
-    QGridLayout, QScrollArea, QTableWidget, QTableWidgetItem, QHeaderView, QMenu
+    QCheckBox, QComboBox, QGroupBox, QMessageBox, QPlainTextEdit,
+    QGridLayout, QScrollArea, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+
+from echomux.ui_components import (
+    FileDropWidget, MaterialButton, get_open_file_names, get_existing_directory,
+    batch_table_update, selected_rows, read_only_item, file_table_menu, call_after_repaint, LanguageDelegate,
+    MediaAnalysisMixin, LanguageTableMixin, MatchingPreviewMixin, JobRunnerMixin
 )
+from echomux.utils import process_paths, open_file_location, detect_language, path_key, VIDEO_EXTENSIONS, SUBTITLE_EXTENSIONS
+from echomux.worker import ProcessingJob, MediaFile
 
-from echomux.ui_components import FileDropWidget, MaterialButton
-from echomux.utils import process_paths, analyze_media_file, get_languages, open_file_location
-from echomux.worker import ProcessingJob, FFmpegWorker, MediaFile
+class SubtitleEmbeddingTab(MediaAnalysisMixin, LanguageTableMixin, MatchingPreviewMixin, JobRunnerMixin, QWidget):
+    PREVIEW_MATCH_ICON = "📝"
+    PREVIEW_NO_MATCH_TEXT = "No matching subtitles found"
 
-class SubtitleEmbeddingTab(QWidget):
     def __init__(self):
         super().__init__()
         self.video_files = []
-        self.subtitle_files_data = [] # List of tuples (filepath, QComboBox)
-        self.languages = get_languages()
+        self._video_paths = set() # path_key() of every entry in video_files
+        self.subtitle_files_data = [] # List of tuples (filepath, language code)
+        self._subtitle_paths = set()
+        self._init_languages()
+        self._init_media_analysis()
+        self._init_matching_preview()
         self.setup_ui()
 
     def setup_ui(self):
@@ -44,8 +52,9 @@ class SubtitleEmbeddingTab(QWidget):
         self.video_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.video_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.video_table.customContextMenuRequested.connect(self._show_video_context_menu)
-        self.video_drop_widget = FileDropWidget(allowed_extensions=['.mp4', '.mkv', '.avi', '.mov', '.m4v'])
-        self.video_drop_widget.files_dropped.connect(self.on_video_files_added)
+        self._video_menu = file_table_menu(self.video_table, self._remove_selected_videos, self._open_selected_video_location)
+        self.video_drop_widget = FileDropWidget(allowed_extensions=VIDEO_EXTENSIONS)
+        self.video_drop_widget.files_dropped.connect(self.queue_media_analysis)
         drop_layout = QVBoxLayout(self.video_drop_widget)
         drop_layout.addWidget(self.video_table)
         drop_layout.setContentsMargins(0,0,0,0)
@@ -73,6 +82,11 @@ class SubtitleEmbeddingTab(QWidget):
         self.subtitle_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.subtitle_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.subtitle_table.customContextMenuRequested.connect(self._show_subtitle_context_menu)
+        self._subtitle_menu = file_table_menu(self.subtitle_table, self._remove_selected_subtitles, self._open_selected_subtitle_location)
+        # Languages are picked through a delegate, so rows don't each carry a combo box widget
+        self.subtitle_table.setItemDelegateForColumn(1, LanguageDelegate(self._language_model, self.subtitle_table))
+        self.subtitle_table.setEditTriggers(self.subtitle_table.editTriggers() | QAbstractItemView.EditTrigger.SelectedClicked)
+        self.subtitle_table.itemChanged.connect(self._on_subtitle_language_changed)
         subtitle_layout.addWidget(self.subtitle_table)
         subtitle_button_layout = QHBoxLayout()
         self.add_subtitle_btn = MaterialButton("Add Subtitle Files")
@@ -110,7 +124,7 @@ class SubtitleEmbeddingTab(QWidget):
         # Preview section
         preview_group = QGroupBox("File Matching Preview")
         preview_layout = QVBoxLayout(preview_group)
-        self.preview_text = QTextEdit()
+        self.preview_text = QPlainTextEdit()
         self.preview_text.setMaximumHeight(150)
         self.preview_text.setReadOnly(True)
         preview_layout.addWidget(self.preview_text)
@@ -144,44 +158,35 @@ class SubtitleEmbeddingTab(QWidget):
         self.subtitle_table.setVisible(False)
 
     def _show_video_context_menu(self, position):
-        self._show_context_menu_for_table(self.video_table, position, self._remove_selected_videos, self._open_selected_video_location)
+        self._show_context_menu_for_table(self.video_table, self._video_menu, position)
 
     def _show_subtitle_context_menu(self, position):
-        self._show_context_menu_for_table(self.subtitle_table, position, self._remove_selected_subtitles, self._open_selected_subtitle_location)
+        self._show_context_menu_for_table(self.subtitle_table, self._subtitle_menu, position)
 
-    def _show_context_menu_for_table(self, table, position, remove_callback, open_callback):
-        if not table.selectedItems():
+    def _show_context_menu_for_table(self, table, menu, position):
+        if not table.selectionModel().hasSelection():
             return
 
-        menu = QMenu()
-        remove_action = menu.addAction("Remove Selected")
-        open_loc_action = menu.addAction("Open File Location")
-
-        action = menu.exec(table.mapToGlobal(position))
-
-        if action == remove_action:
-            remove_callback()
-        elif action == open_loc_action:
-            open_callback()
+        menu.exec(table.mapToGlobal(position))
 
     def _remove_selected_videos(self):
-        selected_rows = sorted(list(set(item.row() for item in self.video_table.selectedItems())), reverse=True)
-        for row in selected_rows:
-            self.video_files.pop(row)
+        rows = selected_rows(self.video_table, reverse=True)
+        for row in rows:
+            self._video_paths.discard(path_key(self.video_files.pop(row).path))
             self.video_table.removeRow(row)
         if self.video_table.rowCount() == 0:
             self.video_drop_widget.setVisible(True)
             self.video_table.setVisible(False)
-        self.update_preview()
+        self.schedule_preview()
 
     def _remove_selected_subtitles(self):
-        selected_rows = sorted(list(set(item.row() for item in self.subtitle_table.selectedItems())), reverse=True)
-        for row in selected_rows:
-            self.subtitle_files_data.pop(row)
+        rows = selected_rows(self.subtitle_table, reverse=True)
+        for row in rows:
+            self._subtitle_paths.discard(path_key(self.subtitle_files_data.pop(row)[0]))
             self.subtitle_table.removeRow(row)
         if self.subtitle_table.rowCount() == 0:
             self.subtitle_table.setVisible(False)
-        self.update_preview()
+        self.schedule_preview()
 
     def _open_selected_video_location(self):
         self._open_location_for_table(self.video_table, self.video_files, is_media_file=True)
@@ -190,30 +195,33 @@ class SubtitleEmbeddingTab(QWidget):
         self._open_location_for_table(self.subtitle_table, self.subtitle_files_data, is_media_file=False)
 
     def _open_location_for_table(self, table, data_list, is_media_file):
-        selected_rows = list(set(item.row() for item in table.selectedItems()))
-        if not selected_rows:
+        rows = selected_rows(table)
+        if not rows:
             return
 
-        item = data_list[selected_rows[0]]
+        item = data_list[rows[0]]
         path = item.path if is_media_file else item[0]
         open_file_location(str(path))
 
     def add_video_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select Video Files", "", "Video Files (*.mp4 *.mkv *.avi *.mov *.m4v)")
+        files = get_open_file_names(self, "Select Video Files", "Video Files (*.mp4 *.mkv *.avi *.mov *.m4v)")
         if files:
-            self.on_video_files_added(files)
+            call_after_repaint(lambda: self.queue_media_analysis(files))
 
     def add_video_folder(self):
-        directory = QFileDialog.getExistingDirectory(self, "Select Folder")
+        directory = get_existing_directory(self, "Select Folder")
         if directory:
-            self.on_video_files_added(process_paths([directory], ['.mp4', '.mkv', '.avi', '.mov', '.m4v']))
+            call_after_repaint(lambda: self.queue_media_analysis(process_paths([directory], VIDEO_EXTENSIONS)))
 
-    def on_video_files_added(self, files: List[str]):
-        for file_path in files:
-            if any(mf.path == Path(file_path) for mf in self.video_files):
+    def _add_analyzed_files(self, results: List[Tuple[str, Optional[Dict]]]):
+        new_rows = []
+        for file_path, info in results:
+            key = path_key(file_path)
+            if key in self._video_paths:
                 continue
-            media_file = MediaFile(Path(file_path), Path(file_path).name)
-            info = analyze_media_file(file_path)
+            self._video_paths.add(key)
+            path = Path(file_path)
+            media_file = MediaFile(path, path.name)
             duration_str, sub_info_str = "N/A", "Analysis Failed"
             if info:
                 try:
@@ -221,110 +229,94 @@ class SubtitleEmbeddingTab(QWidget):
                     duration_str = f"{duration:.2f}s"
                     media_file.duration = duration
                     sub_streams = [s for s in info.get('streams', []) if s.get('codec_type') == 'subtitle']
+                    media_file.subtitle_tracks = sub_streams
                     sub_info_str = ", ".join([s.get('tags', {}).get('language', 'und') for s in sub_streams]) if sub_streams else "No Subtitles"
                 except (ValueError, TypeError):
                     pass
             self.video_files.append(media_file)
-            row_pos = self.video_table.rowCount()
-            self.video_table.insertRow(row_pos)
-            self.video_table.setItem(row_pos, 0, QTableWidgetItem(media_file.filename))
-            self.video_table.setItem(row_pos, 1, QTableWidgetItem(duration_str))
-            self.video_table.setItem(row_pos, 2, QTableWidgetItem(sub_info_str))
+            new_rows.append((media_file.filename, duration_str, sub_info_str))
+
+        with batch_table_update(self.video_table):
+            first_row = self.video_table.rowCount()
+            self.video_table.setRowCount(first_row + len(new_rows))
+            for row, cells in enumerate(new_rows, first_row):
+                for column, text in enumerate(cells):
+                    self.video_table.setItem(row, column, read_only_item(text))
 
         self.video_drop_widget.setVisible(self.video_table.rowCount() == 0)
         self.video_table.setVisible(self.video_table.rowCount() > 0)
-        self.update_preview()
+        self._extend_preview()
 
     def clear_video_files(self):
+        self.cancel_media_analysis()
         self.video_table.setRowCount(0)
         self.video_files = []
+        self._video_paths.clear()
         self.video_drop_widget.setVisible(True)
         self.video_table.setVisible(False)
-        self.update_preview()
+        self.schedule_preview()
 
     def add_subtitle_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select Subtitle Files", "", "Subtitle Files (*.srt *.ass *.vtt *.sub)")
+        files = get_open_file_names(self, "Select Subtitle Files", "Subtitle Files (*.srt *.ass *.vtt *.sub)")
         if files:
-            self.on_subtitle_files_added(files)
+            call_after_repaint(lambda: self.on_subtitle_files_added(files))
 
     def add_subtitle_folder(self):
-        directory = QFileDialog.getExistingDirectory(self, "Select Folder")
+        directory = get_existing_directory(self, "Select Folder")
         if directory:
-            self.on_subtitle_files_added(process_paths([directory], ['.srt', '.ass', '.vtt', '.sub']))
+            call_after_repaint(lambda: self.on_subtitle_files_added(process_paths([directory], SUBTITLE_EXTENSIONS)))
 
     def on_subtitle_files_added(self, files: List[str]):
+        new_files = []
         for file_path in files:
-            if any(sf[0] == file_path for sf in self.subtitle_files_data):
-                continue
-            row_pos = self.subtitle_table.rowCount()
-            self.subtitle_table.insertRow(row_pos)
-            self.subtitle_table.setItem(row_pos, 0, QTableWidgetItem(Path(file_path).name))
-            lang_combo = QComboBox()
-            for name, code in self.languages:
-                lang_combo.addItem(f"{name} ({code})", code)
-            self.subtitle_table.setCellWidget(row_pos, 1, lang_combo)
-            self.subtitle_files_data.append((file_path, lang_combo))
+            key = path_key(file_path)
+            if key not in self._subtitle_paths:
+                self._subtitle_paths.add(key)
+                new_files.append(file_path)
+
+        with batch_table_update(self.subtitle_table):
+            first_row = self.subtitle_table.rowCount()
+            self.subtitle_table.setRowCount(first_row + len(new_files))
+            for row_pos, file_path in enumerate(new_files, first_row):
+                self.subtitle_table.setItem(row_pos, 0, read_only_item(os.path.basename(file_path)))
+                code = detect_language(file_path, self.languages) or self.languages[0][1]
+                self.subtitle_table.setItem(row_pos, 1, self._language_item(code))
+                self.subtitle_files_data.append((file_path, code))
         self.subtitle_table.setVisible(self.subtitle_table.rowCount() > 0)
-        self.update_preview()
+        self.schedule_preview()
 
     def clear_subtitle_files(self):
         self.subtitle_table.setRowCount(0)
         self.subtitle_files_data = []
+        self._subtitle_paths.clear()
         self.subtitle_table.setVisible(False)
-        self.update_preview()
-
-    def refresh_language_dropdowns(self):
-        self.languages = get_languages()
-        for i in range(self.subtitle_table.rowCount()):
-            combo = self.subtitle_table.cellWidget(i, 1)
-            if combo:
-                current_code = combo.currentData()
-                combo.clear()
-                for n, c in self.languages:
-                    combo.addItem(f"{n} ({c})", c)
-                combo.setCurrentIndex(combo.findData(current_code))
-
-    def showEvent(self, event):
-        super().showEvent(event)
-        self.refresh_language_dropdowns()
+        self.schedule_preview()
+
+    def _on_subtitle_language_changed(self, item: QTableWidgetItem):
+        self._store_language(self.subtitle_files_data, item)
 
     def browse_output(self):
-        directory = QFileDialog.getExistingDirectory(self, "Select Output Directory")
+        directory = get_existing_directory(self, "Select Output Directory")
         if directory:
             self.output_path.setText(directory)
 
-    def update_preview(self):
-        if not self.video_files or not self.subtitle_files_data:
-            self.preview_text.clear()
-            return
-        preview_text = "File Matching Preview:\n\n"
-        subtitle_paths = [sf[0] for sf in self.subtitle_files_data]
-        for video_file in self.video_files:
-            base_name = video_file.path.stem.lower()
-            matching_subs = [Path(p).name for p in subtitle_paths if base_name in Path(p).stem.lower() or Path(p).stem.lower() in base_name]
-            preview_text += f"📹 {video_file.filename}\n"
-            if matching_subs:
-                for sub in matching_subs:
-                    preview_text += f"  └── 📝 {sub}\n"
-            else:
-                preview_text += "  └── ⚠️ No matching subtitles found\n"
-            preview_text += "\n"
-        self.preview_text.setText(preview_text)
+    def _preview_candidates(self) -> List[str]:
+        return [file_path for file_path, _ in self.subtitle_files_data]
 
     def start_embedding(self):
         if not self.video_files or not self.subtitle_files_data:
             QMessageBox.warning(self, "Warning", "Please add video and subtitle files first.")
             return
-        if not self.output_path.text():
+        output_directory = self.output_path.text()
+        if not output_directory:
             QMessageBox.warning(self, "Warning", "Please select an output directory.")
             return
 
-        subtitle_files = [sf[0] for sf in self.subtitle_files_data]
-        languages = [sf[1].currentData() for sf in self.subtitle_files_data]
+        subtitle_files, languages = map(list, zip(*self.subtitle_files_data))
 
         job = ProcessingJob(
             input_files=self.video_files,
-            output_directory=Path(self.output_path.text()),
+            output_directory=Path(output_directory),
             job_type='embed',
             settings={
                 'subtitle_files': subtitle_files,
@@ -333,26 +325,4 @@ class SubtitleEmbeddingTab(QWidget):
                 'default_subtitle': self.default_subtitle.isChecked()
             }
         )
-        self.worker = FFmpegWorker(job)
-        self.worker.progress_updated.connect(self.progress_bar.setValue)
-        self.worker.status_updated.connect(self.status_label.setText)
-        self.worker.job_completed.connect(self.on_job_completed)
-        self.cancel_btn.clicked.connect(self.worker.cancel)
-
-        self.embed_btn.setEnabled(False)
-        self.cancel_btn.setEnabled(True)
-        self.worker.start()
-
-    def on_job_completed(self, message, success):
-        try:
-            self.cancel_btn.clicked.disconnect(self.worker.cancel)
-        except TypeError:
-            pass
-
-        self.embed_btn.setEnabled(True)
-        self.cancel_btn.setEnabled(False)
-        self.status_label.setText(message)
-        if success:
-            QMessageBox.information(self, "Success", message)
-        else:
-            QMessageBox.critical(self, "Error", message)
+        self._start_job(job, self.embed_btn)
@@ -17,13 +17,13 @@ QGroupBox::title {
     padding: 0 5px 0 5px;
     color: #1E88E5;
 }
-QLineEdit, QComboBox, QTextEdit {
+QLineEdit, QComboBox, QTextEdit, QPlainTextEdit {
     border: 1px solid #CCCCCC;
     border-radius: 4px;
     padding: 8px;
     background-color: #FFFFFF;
 }
-QLineEdit:focus, QComboBox:focus, QTextEdit:focus {
+QLineEdit:focus, QComboBox:focus, QTextEdit:focus, QPlainTextEdit:focus {
     border-color: #1E88E5;
 }
 QTableWidget {
@@ -82,6 +82,10 @@ QTabBar::tab:selected {
     background-color: #1E88E5;
     color: white;
 }
+QLabel#AppHeader {
+    padding: 20px;
+    color: #1E88E5;
+}
 """
 
 DARK_STYLESHEET = """
@@ -103,13 +107,13 @@ QGroupBox::title {
     padding: 0 5px 0 5px;
     color: #42A5F5;
 }
-QLineEdit, QComboBox, QTextEdit {
+QLineEdit, QComboBox, QTextEdit, QPlainTextEdit {
     border: 1px solid #505050;
     border-radius: 4px;
     padding: 8px;
     background-color: #383838;
 }
-QLineEdit:focus, QComboBox:focus, QTextEdit:focus {
+QLineEdit:focus, QComboBox:focus, QTextEdit:focus, QPlainTextEdit:focus {
     border-color: #42A5F5;
 }
 QTableWidget {
@@ -171,4 +175,8 @@ QTabBar::tab:selected {
     color: #1D1D1D;
     font-weight: bold;
 }
+QLabel#AppHeader {
+    padding: 20px;
+    color: #42A5F5;
+}
 """
@@ -1,16 +1,418 @@
 from PyQt6.QtWidgets import (
-    QPushButton, QListWidget, QListWidgetItem
+    QPushButton, QListWidget, QListWidgetItem, QFileDialog, QComboBox, QStyledItemDelegate, QTableWidgetItem, QMenu,
+    QMessageBox
 )
 from PyQt6.QtCore import (
-    Qt, pyqtSignal
+    Qt, pyqtSignal, QCoreApplication, QSettings, QTimer
 )
 from PyQt6.QtGui import (
-    QFont, QDragEnterEvent, QDropEvent
+    QFont, QDragEnterEvent, QDropEvent, QStandardItem, QStandardItemModel, QTextCursor
 )
+import os
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from echomux.utils import process_paths
+from typing import Callable, Dict, List, Optional, Tuple
+from echomux.utils import (
+    process_paths, get_languages, get_language_labels, match_files_to_videos, CandidateIndex, VIDEO_EXTENSIONS
+)
+from echomux.worker import FFmpegWorker, MediaAnalysisWorker, MediaFile, ProcessingJob
+
+# Skip per-entry icon lookups and symlink resolution, which make large or network folders slow to list,
+# and open the dialog read-only since it is never used to rename or delete files
+FILE_DIALOG_OPTIONS = (
+    QFileDialog.Option.DontUseCustomDirectoryIcons | QFileDialog.Option.DontResolveSymlinks
+    | QFileDialog.Option.ReadOnly
+)
+
+
+@contextmanager
+def batch_table_update(table):
+    """
+    Suspends repaints, sorting and item signals on a table while many rows are changed,
+    so the table is laid out and repainted once for the whole batch.
+    """
+    sorting_enabled = table.isSortingEnabled()
+    table.setUpdatesEnabled(False)
+    table.setSortingEnabled(False)
+    table.blockSignals(True)
+    try:
+        yield table
+    finally:
+        table.blockSignals(False)
+        table.setSortingEnabled(sorting_enabled)
+        table.setUpdatesEnabled(True)
+
+
+READ_ONLY_ITEM_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+
+def read_only_item(text: str) -> QTableWidgetItem:
+    """
+    Creates a table item that can be selected but not edited, for cells that only display file information.
+    """
+    item = QTableWidgetItem(text)
+    item.setFlags(READ_ONLY_ITEM_FLAGS)
+    return item
+
+
+def selected_rows(table, reverse: bool = False) -> List[int]:
+    """
+    Returns the distinct rows that have a selected cell, read from the selection ranges
+    rather than from one item per selected cell.
+    """
+    rows = {
+        row
+        for selection_range in table.selectionModel().selection()
+        for row in range(selection_range.top(), selection_range.bottom() + 1)
+    }
+    return sorted(rows, reverse=reverse)
+
+
+def file_table_menu(table, remove_callback, open_callback) -> QMenu:
+    """
+    Builds the right-click menu of a file table once, with its actions wired to the given callbacks.
+    """
+    menu = QMenu(table)
+    menu.addAction("Remove Selected").triggered.connect(remove_callback)
+    menu.addAction("Open File Location").triggered.connect(open_callback)
+    return menu
+
+
+def fill_language_model(model: QStandardItemModel, language_labels: Dict[str, str]):
+    """
+    Fills a model with one "Name (code)" entry per language, holding the code as its user data.
+    Language combo boxes share one such model instead of each adding every language itself.
+    """
+    model.clear()
+    for code, label in language_labels.items():
+        item = QStandardItem(label)
+        item.setData(code, Qt.ItemDataRole.UserRole)
+        model.appendRow(item)
+
+
+class LanguageDelegate(QStyledItemDelegate):
+    """
+    Edits a language cell with a combo box over a shared language model. The combo box only
+    exists while the cell is being edited; the cell itself holds the display text and keeps
+    the language code as its user data.
+    """
+
+    def __init__(self, language_model: QStandardItemModel, parent=None):
+        super().__init__(parent)
+        self.language_model = language_model
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.setModel(self.language_model)
+        # Picking a language finishes the edit, like choosing from an always-visible combo box
+        combo.activated.connect(lambda _: self._finish_editing(combo))
+        return combo
+
+    def _finish_editing(self, combo: QComboBox):
+        self.commitData.emit(combo)
+        self.closeEditor.emit(combo)
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentIndex(max(0, editor.findData(index.data(Qt.ItemDataRole.UserRole))))
+
+    def setModelData(self, editor, model, index):
+        # The view pushes every data change back into the open editor, so capture both values first
+        code, label = editor.currentData(), editor.currentText()
+        model.setData(index, label, Qt.ItemDataRole.DisplayRole)
+        model.setData(index, code, Qt.ItemDataRole.UserRole)
+
+
+@lru_cache(maxsize=1)
+def app_settings() -> QSettings:
+    """
+    Returns the QSettings object shared by the UI, so widgets don't each open their own.
+    A QSettings object must not be used from several threads, so code that can run in
+    a worker thread keeps creating its own.
+    """
+    return QSettings("EchoMux", "EchoMux")
+
+
+def get_open_file_names(parent, caption: str, file_filter: str) -> List[str]:
+    """
+    Shows the platform file picker, starting in the last folder files were picked from.
+    """
+    settings = app_settings()
+    files, _ = QFileDialog.getOpenFileNames(
+        parent, caption, settings.value("last_directory", "", type=str), file_filter,
+        options=FILE_DIALOG_OPTIONS
+    )
+    if files:
+        settings.setValue("last_directory", str(Path(files[0]).parent))
+    return files
+
+
+def get_existing_directory(parent, caption: str) -> str:
+    """
+    Shows the platform folder picker, starting in the last folder files were picked from.
+    """
+    settings = app_settings()
+    directory = QFileDialog.getExistingDirectory(
+        parent, caption, settings.value("last_directory", "", type=str),
+        options=QFileDialog.Option.ShowDirsOnly | FILE_DIALOG_OPTIONS
+    )
+    if directory:
+        settings.setValue("last_directory", directory)
+    return directory
+
+
+def call_after_repaint(callback: Callable[[], None]):
+    """
+    Runs callback once control is back in the event loop, so a file dialog that was just
+    accepted can close and the window behind it repaint before the files are handled.
+    """
+    QTimer.singleShot(0, callback)
+
+
+class MediaAnalysisMixin:
+    """
+    Probes the video files added to a tab on MediaAnalysisWorkers. The tab defines
+    _add_analyzed_files(results), which receives each batch as a list of (file path,
+    ffprobe info or None) pairs. Call _init_media_analysis() from __init__, and
+    cancel_media_analysis() when the tab's file list is cleared.
+    """
+
+    def _init_media_analysis(self):
+        # Drops that arrive in quick succession are probed as one batch
+        self._pending_files = []
+        self._pending_timer = QTimer(self)
+        self._pending_timer.setSingleShot(True)
+        self._pending_timer.setInterval(50)
+        self._pending_timer.timeout.connect(self._analyze_pending_files)
+        # Running analyzers, each with the generation it was started in; clearing the
+        # list starts a new generation so batches still on their way are dropped
+        self._analyzers = {}
+        self._analysis_generation = 0
+        # A QThread must not be destroyed while it runs, and the tab goes away with the window
+        QCoreApplication.instance().aboutToQuit.connect(self._wait_for_media_analysis)
+
+    def queue_media_analysis(self, files: List[str]):
+        self._pending_files.extend(files)
+        self._pending_timer.start()
+
+    def cancel_media_analysis(self):
+        self._pending_timer.stop()
+        self._pending_files = []
+        self._analysis_generation += 1
+        for analyzer in self._analyzers:
+            analyzer.requestInterruption()
+
+    def _analyze_pending_files(self):
+        files, self._pending_files = self._pending_files, []
+        if not files:
+            return
+        # ffprobe runs in the background; the rows are added once it is done
+        analyzer = MediaAnalysisWorker(files, self)
+        self._analyzers[analyzer] = self._analysis_generation
+        analyzer.files_analyzed.connect(self._on_files_analyzed)
+        analyzer.finished.connect(self._on_analyzer_finished)
+        analyzer.start()
+
+    def _on_files_analyzed(self, results: List[Tuple[str, Optional[Dict]]]):
+        if self._analyzers.get(self.sender()) == self._analysis_generation:
+            self._add_analyzed_files(results)
+
+    def _on_analyzer_finished(self):
+        analyzer = self.sender()
+        self._analyzers.pop(analyzer, None)
+        analyzer.deleteLater()
+
+    def _wait_for_media_analysis(self):
+        self.cancel_media_analysis()
+        for analyzer in list(self._analyzers):
+            analyzer.wait()
+
+
+class LanguageTableMixin:
+    """
+    Holds the language list and the model shared by the LanguageDelegate of a tab's files table,
+    reloaded whenever the tab is shown in case languages were edited in the Settings tab.
+    Call _init_languages() from __init__ before the table is built.
+    """
+
+    def _init_languages(self):
+        self.languages = get_languages()
+        self._language_labels = get_language_labels()
+        # Shared by every language combo box in the table
+        self._language_model = QStandardItemModel(self)
+        fill_language_model(self._language_model, self._language_labels)
+
+    def refresh_language_dropdowns(self):
+        languages = get_languages()
+        if languages is self.languages:
+            # Nothing was added or removed in the Settings tab since the last refresh
+            return
+        self.languages = languages
+        self._language_labels = get_language_labels()
+        fill_language_model(self._language_model, self._language_labels)
+
+    def _language_item(self, code: str) -> QTableWidgetItem:
+        item = QTableWidgetItem(self._language_labels.get(code, code))
+        item.setData(Qt.ItemDataRole.UserRole, code)
+        return item
+
+    def _store_language(self, files_data: List[Tuple[str, str]], item: QTableWidgetItem):
+        """Copies a language picked in column 1 into the matching (file path, language code) entry"""
+        if item.column() != 1:
+            return
+        file_path, _ = files_data[item.row()]
+        files_data[item.row()] = (file_path, item.data(Qt.ItemDataRole.UserRole))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_language_dropdowns()
+
+
+class MatchingPreviewMixin:
+    """
+    Renders the File Matching Preview of a tab that pairs files with its video_files, into its
+    preview_text widget. The tab defines _preview_candidates(), returning the paths of the files
+    to match, and sets the icon and text shown for matched and missing files. Call
+    _init_matching_preview() from __init__.
+    """
+    PREVIEW_MATCH_ICON = ""
+    PREVIEW_NO_MATCH_TEXT = ""
+
+    def _init_matching_preview(self):
+        self._rendered_video_count = 0 # Videos already shown in the matching preview
+        self._cached_candidates = None
+        # Bursts of list edits re-render the matching preview once
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.timeout.connect(self.update_preview)
+
+    def schedule_preview(self):
+        # QTimer.start() restarts a running timer, so only the last change in a burst triggers a render
+        self._preview_timer.start()
+
+    def update_preview(self):
+        self._preview_timer.stop()
+        self._rendered_video_count = 0
+        if not self.video_files or not self._preview_candidates():
+            self.preview_text.clear()
+            return
+        parts = ["File Matching Preview:\n\n"] + self._preview_blocks(self.video_files)
+        self.preview_text.setPlainText("".join(parts))
+        self._rendered_video_count = len(self.video_files)
+
+    def _extend_preview(self):
+        """Appends blocks for videos added since the last render, leaving the ones already shown alone"""
+        if not self._rendered_video_count:
+            self.schedule_preview()
+            return
+        new_videos = self.video_files[self._rendered_video_count:]
+        if not new_videos:
+            return
+        cursor = self.preview_text.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText("".join(self._preview_blocks(new_videos)))
+        self._rendered_video_count = len(self.video_files)
+
+    def _candidate_index(self, candidate_paths: List[str]) -> CandidateIndex:
+        # Preview batches reuse the parsed candidates until the candidate list itself changes
+        if self._cached_candidates is None or self._cached_candidates.paths != tuple(candidate_paths):
+            self._cached_candidates = CandidateIndex(candidate_paths)
+        return self._cached_candidates
+
+    def _preview_blocks(self, video_files: List[MediaFile]) -> List[str]:
+        candidate_paths = self._preview_candidates()
+        # Same indexed matching the worker uses, so the preview shows exactly what will be processed
+        all_matches = match_files_to_videos(
+            [video_file.path for video_file in video_files], candidate_paths, self._candidate_index(candidate_paths)
+        )
+        parts = []
+        for video_file, matches in zip(video_files, all_matches):
+            parts.append(f"📹 {video_file.filename}\n")
+            if matches:
+                parts.extend(f"  └── {self.PREVIEW_MATCH_ICON} {os.path.basename(match)}\n" for match in matches)
+            else:
+                parts.append(f"  └── ⚠️ {self.PREVIEW_NO_MATCH_TEXT}\n")
+            parts.append("\n")
+        return parts
+
+
+class JobRunnerMixin:
+    """
+    Runs a ProcessingJob on an FFmpegWorker for a tab with progress_bar, status_label and
+    cancel_btn widgets, keeping the tab's start button disabled while the job runs.
+    """
+
+    def _start_job(self, job: ProcessingJob, start_button: QPushButton):
+        self._start_button = start_button
+        self.worker = FFmpegWorker(job)
+        self.worker.progress_updated.connect(self.progress_bar.setValue)
+        self.worker.status_updated.connect(self.status_label.setText)
+        self.worker.job_completed.connect(self.on_job_completed)
+        self.cancel_btn.clicked.connect(self.worker.cancel)
+        self.worker.finished.connect(self.on_worker_finished)
+
+        start_button.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.worker.start()
+
+    def on_worker_finished(self):
+        # QThread.finished fires after every run, including cancelled ones that never report completion
+        try:
+            self.cancel_btn.clicked.disconnect(self.worker.cancel)
+        except TypeError: # Signal may already be disconnected
+            pass
+
+        self._start_button.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        if self.worker.is_cancelled:
+            self.status_label.setText("Cancelled")
+
+        # Drop the finished thread so runs don't accumulate dead workers
+        self.worker.wait()
+        self.worker.deleteLater()
+        self.worker = None
+
+    def on_job_completed(self, message, success):
+        self.status_label.setText(message)
+        if success:
+            QMessageBox.information(self, "Success", message)
+        else:
+            QMessageBox.critical(self, "Error", message)
+
 
 class MaterialButton(QPushButton):
+    _PRIMARY_QSS = """
+        QPushButton {
+            background-color: #2196F3;
+            color: white;
+            border: none;
+            border-radius: 4px;
+            padding: 8px 16px;
+        }
+        QPushButton:hover {
+            background-color: #1976D2;
+        }
+        QPushButton:pressed {
+            background-color: #0D47A1;
+        }
+    """
+    _SECONDARY_QSS = """
+        QPushButton {
+            background-color: #FAFAFA;
+            color: #212121;
+            border: 1px solid #E0E0E0;
+            border-radius: 4px;
+            padding: 8px 16px;
+        }
+        QPushButton:hover {
+            background-color: #F5F5F5;
+        }
+        QPushButton:pressed {
+            background-color: #EEEEEE;
+        }
+    """
+
     def __init__(self, text, primary=False):
         super().__init__(text)
         self.primary = primary
@@ -19,38 +421,7 @@ class MaterialButton(QPushButton):
         self.update_style()
 
     def update_style(self):
-        if self.primary:
-            self.setStyleSheet("""
-                QPushButton {
-                    background-color: #2196F3;
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    padding: 8px 16px;
-                }
-                QPushButton:hover {
-                    background-color: #1976D2;
-                }
-                QPushButton:pressed {
-                    background-color: #0D47A1;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QPushButton {
-                    background-color: #FAFAFA;
-                    color: #212121;
-                    border: 1px solid #E0E0E0;
-                    border-radius: 4px;
-                    padding: 8px 16px;
-                }
-                QPushButton:hover {
-                    background-color: #F5F5F5;
-                }
-                QPushButton:pressed {
-                    background-color: #EEEEEE;
-                }
-            """)
+        self.setStyleSheet(self._PRIMARY_QSS if self.primary else self._SECONDARY_QSS)
 
 class FileDropWidget(QListWidget):
     files_dropped = pyqtSignal(list)
@@ -59,6 +430,8 @@ class FileDropWidget(QListWidget):
         super().__init__()
         self.setAcceptDrops(True)
         self.setMinimumHeight(150)
+        # Every row is a single line of text, so the view can skip measuring rows one by one
+        self.setUniformItemSizes(True)
         self.setStyleSheet("""
             QListWidget {
                 border: 2px dashed #BDBDBD;
@@ -74,9 +447,9 @@ class FileDropWidget(QListWidget):
 
         # Set allowed file extensions
         if allowed_extensions is None:
-            self.allowed_extensions = ['.mp4', '.mkv', '.avi', '.mov', '.m4v']
+            self.allowed_extensions = VIDEO_EXTENSIONS
         else:
-            self.allowed_extensions = [ext.lower() for ext in allowed_extensions]
+            self.allowed_extensions = frozenset(ext.lower() for ext in allowed_extensions)
 
         # Add placeholder text
         self.placeholder = QListWidgetItem("Drop files here or click 'Add Files' button")
@@ -89,9 +462,16 @@ class FileDropWidget(QListWidget):
         else:
             event.ignore()
 
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
     def dropEvent(self, event: QDropEvent):
         if not event.mimeData().hasUrls():
             return
+        event.acceptProposedAction()
 
         # Get a list of paths from the drop event
         dropped_paths = [url.toLocalFile() for url in event.mimeData().urls()]
@@ -112,9 +492,9 @@ class QTableWidgetWithDrop(QTableWidget):
         super().__init__()
         self.setAcceptDrops(True)
         if allowed_extensions is None:
-            self.allowed_extensions = []
+            self.allowed_extensions = frozenset()
         else:
-            self.allowed_extensions = [ext.lower() for ext in allowed_extensions]
+            self.allowed_extensions = frozenset(ext.lower() for ext in allowed_extensions)
 
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
@@ -1,16 +1,34 @@
+import os
 import re
-import subprocess
+import sys
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QThread, QObject, QProcess, QEventLoop, QTimer, pyqtSignal
 
-from echomux.utils import get_ffmpeg_path, analyze_media_file
+from echomux.utils import (
+    get_ffmpeg_path, get_max_threads, resolve_executable, analyze_media_file, analyze_media_files,
+    match_files_to_videos, clean_show_name, sanitize_filename_part
+)
+
+
+# Output format -> (ffprobe codec name, ffmpeg encoder)
+AUDIO_FORMATS = {
+    'aac': ('aac', 'aac'),
+    'mp3': ('mp3', 'libmp3lame'),
+    'flac': ('flac', 'flac'),
+    'ogg': ('vorbis', 'libvorbis'),
+}
+
+
+# Slotted data classes skip the per-instance __dict__; the option only exists on Python 3.10+
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 
 # Data classes for managing media files
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class MediaFile:
     path: Path
     filename: str
@@ -25,7 +43,7 @@ class MediaFile:
             self.subtitle_tracks = []
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ProcessingJob:
     input_files: List[MediaFile]
     output_directory: Path
@@ -33,15 +51,191 @@ class ProcessingJob:
     settings: Dict
 
 
+@dataclass(**_DATACLASS_OPTIONS)
+class FFmpegTask:
+    """A single ffmpeg invocation for one file."""
+    index: int
+    media_file: MediaFile
+    cmd: List[str]
+    status_message: str
+    failure_message: str
+
+
+class MediaAnalysisWorker(QThread):
+    """
+    Probes newly added files in the background so dropping a large folder doesn't freeze the UI.
+    Emits files_analyzed with lists of (file_path, ffprobe info or None) pairs, in input order,
+    one list per batch so the first rows show up while the rest are still being probed.
+    Stops after the current batch once requestInterruption() is called.
+    """
+    files_analyzed = pyqtSignal(list)
+    BATCH_SIZE = 32
+
+    def __init__(self, file_paths: List[str], parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.file_paths = list(file_paths)
+
+    def run(self):
+        for start in range(0, len(self.file_paths), self.BATCH_SIZE):
+            if self.isInterruptionRequested():
+                return
+            batch = self.file_paths[start:start + self.BATCH_SIZE]
+            self.files_analyzed.emit(list(zip(batch, analyze_media_files(batch))))
+
+
+class EpisodeTitleWorker(QThread):
+    """
+    Looks up a show and the titles of some of its episodes on TMDB in the background, so the rename
+    preview never waits on the network. Emits titles_ready with the show name and a dict mapping each
+    (season, episode) pair to its title, or None when it was not found; the dict is empty when the
+    show itself was not found.
+    """
+    titles_ready = pyqtSignal(str, dict)
+
+    def __init__(self, api_client, show_name: str, episodes: List[Tuple[int, int]], parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.show_name = show_name
+        self.episodes = list(episodes)
+
+    def run(self):
+        show = self.api_client.search_show(self.show_name)
+        titles = self.api_client.get_episode_titles_bulk(show.id, self.episodes) if show else {}
+        self.titles_ready.emit(self.show_name, titles)
+
+
+class FFmpegProcessRunner(QObject):
+    """
+    Runs ffmpeg tasks as QProcesses, at most max_concurrent at a time, from the
+    calling thread's event loop. Progress is read as ffmpeg writes it, so no
+    thread ever blocks on a pipe.
+    """
+    # Several ffmpeg processes run side by side, so none of them may wait on or read the terminal
+    GLOBAL_OPTIONS = ['-nostdin', '-hide_banner', '-nostats', '-loglevel', 'error']
+
+    def __init__(self, worker: 'FFmpegWorker', tasks: List[FFmpegTask], max_concurrent: int):
+        super().__init__()
+        self.worker = worker
+        self.queue = deque(tasks)
+        self.max_concurrent = max(1, max_concurrent)
+        self.total_tasks = len(tasks)
+        self.completed = 0
+        self.task_progress: Dict[int, float] = {}
+        self.failures: List[str] = []
+        self.running: List[QProcess] = []
+        self.loop = QEventLoop()
+        self.cancel_timer = QTimer()
+        self.cancel_timer.setInterval(100)
+        self.cancel_timer.timeout.connect(self._check_cancelled)
+        self._killed = False
+
+    def run(self):
+        """Blocks until every task has finished or the job has been cancelled."""
+        for _ in range(min(self.max_concurrent, len(self.queue))):
+            self._start_next()
+        if self.running:
+            self.cancel_timer.start()
+            self.loop.exec()
+            self.cancel_timer.stop()
+
+    def _start_next(self):
+        task = self.queue.popleft()
+        self.worker.status_updated.emit(task.status_message)
+        # The duration is normally known from the analysis done when the file was added
+        duration = task.media_file.duration or self.worker._get_duration(task.media_file.path)
+        if duration == 0:
+            self.worker.status_updated.emit(f"Could not get duration for {task.media_file.filename}. Progress will not be shown.")
+        total_us = duration * 1_000_000
+
+        process = QProcess(self)
+        process.setProgram(task.cmd[0])
+        process.setStandardInputFile(QProcess.nullDevice())
+        if total_us > 0:
+            # Ask ffmpeg for key=value progress reports on stdout instead of scraping its stats output
+            process.setArguments(['-progress', 'pipe:1'] + self.GLOBAL_OPTIONS + task.cmd[1:])
+            process.readyReadStandardOutput.connect(lambda: self._read_progress(process, task, total_us))
+        else:
+            # Without a duration there is no progress to report, so ffmpeg's stdout is discarded
+            process.setArguments(self.GLOBAL_OPTIONS + task.cmd[1:])
+            process.setStandardOutputFile(QProcess.nullDevice())
+        process.finished.connect(lambda exit_code, exit_status: self._on_finished(process, task, exit_code, exit_status))
+        process.errorOccurred.connect(lambda error: self._on_error(process, task, error))
+
+        self.task_progress[task.index] = 0.0
+        self.running.append(process)
+        process.start()
+
+    def _read_progress(self, process: QProcess, task: FFmpegTask, total_us: float):
+        """Turns ffmpeg's out_time_us progress reports into per-file progress."""
+        updated = False
+        while process.canReadLine():
+            key, _, value = bytes(process.readLine()).decode(errors='ignore').strip().partition('=')
+            if key == 'out_time_us' and value.isdigit():
+                self.task_progress[task.index] = min(int(value) / total_us, 1.0)
+                updated = True
+        if updated:
+            self._emit_overall_progress()
+
+    def _on_finished(self, process: QProcess, task: FFmpegTask, exit_code: int, exit_status: QProcess.ExitStatus):
+        failed = exit_code != 0 or exit_status != QProcess.ExitStatus.NormalExit
+        if failed and not self.worker.is_cancelled:
+            # With -loglevel error, stderr only carries the reason for a failure
+            error_output = bytes(process.readAllStandardError()).decode(errors='ignore').strip()
+            message = task.failure_message
+            if error_output:
+                message += f"\n{error_output.splitlines()[-1]}"
+            self.failures.append(message)
+        self._task_done(process, task)
+
+    def _on_error(self, process: QProcess, task: FFmpegTask, error: QProcess.ProcessError):
+        # A process that never started will not emit finished
+        if error == QProcess.ProcessError.FailedToStart:
+            self.failures.append(f"An error occurred with {task.media_file.filename}: {process.errorString()}")
+            self._task_done(process, task)
+
+    def _task_done(self, process: QProcess, task: FFmpegTask):
+        self.running.remove(process)
+        process.deleteLater()
+        self.completed += 1
+        self.task_progress.pop(task.index, None)
+        self._emit_overall_progress()
+
+        if self.queue and not self.worker.is_cancelled:
+            self._start_next()
+        elif not self.running:
+            self.loop.quit()
+
+    def _emit_overall_progress(self):
+        """Combines finished files and the fractions of in-flight files into one percentage."""
+        done = self.completed + sum(self.task_progress.values())
+        self.worker.progress_updated.emit(int(done / self.total_tasks * 100))
+
+    def _check_cancelled(self):
+        if self.worker.is_cancelled and not self._killed:
+            self._killed = True
+            self.queue.clear()
+            for process in self.running:
+                process.kill()
+
+
 class FFmpegWorker(QThread):
     progress_updated = pyqtSignal(int)
     status_updated = pyqtSignal(str)
     job_completed = pyqtSignal(str, bool)
 
+    _SE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+        r'[Ss](\d{1,2})[Ee](\d{1,2})',  # S01E01
+        r'(\d{1,2})x(\d{1,2})',  # 1x01
+        r'Season\s*(\d{1,2}).*Episode\s*(\d{1,2})',  # Season 1 Episode 1
+        r'(\d{1,2})\s*-\s*(\d{1,2})',  # 1-01
+    ))
+
     def __init__(self, job: ProcessingJob):
         super().__init__()
         self.job = job
         self.is_cancelled = False
+        self.ffmpeg_path = resolve_executable(get_ffmpeg_path())
+        self._episode_titles: Dict[Tuple[str, int, int], str] = {}
 
     def run(self):
         try:
@@ -57,179 +251,109 @@ class FFmpegWorker(QThread):
             self.job_completed.emit(f"Error: {str(e)}", False)
 
     def _get_duration(self, file_path: Path) -> float:
-        """Gets the duration of a media file in seconds using ffprobe."""
-        ffmpeg_path = get_ffmpeg_path()
-        ffprobe_path = str(Path(ffmpeg_path).parent / "ffprobe")
-        cmd = [
-            ffprobe_path,
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(file_path)
-        ]
+        """Gets the duration of a media file in seconds from its ffprobe analysis."""
+        info = analyze_media_file(str(file_path))
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return float(result.stdout.strip())
-        except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+            return float(info['format']['duration'])
+        except (TypeError, KeyError, ValueError):
             return 0.0
 
-    def _time_str_to_seconds(self, time_str: str) -> float:
-        """Converts FFmpeg's time string (HH:MM:SS.ms) to seconds."""
-        parts = time_str.split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = float(parts[2])
-        return hours * 3600 + minutes * 60 + seconds
+    def _probe_audio_codec(self, file_path: Path) -> str:
+        """Gets the codec name of the first audio stream from the file's ffprobe analysis."""
+        info = analyze_media_file(str(file_path))
+        for stream in (info or {}).get('streams', []):
+            if stream.get('codec_type') == 'audio':
+                return stream.get('codec_name', '')
+        return ""
+
+    def _source_audio_codec(self, media_file: MediaFile) -> str:
+        """Uses the codec found when the file was analyzed, probing only if it is unknown."""
+        if media_file.audio_tracks:
+            return media_file.audio_tracks[0].get('codec_name', '')
+        return self._probe_audio_codec(media_file.path)
 
     def build_extract_audio_cmd(self, media_file: MediaFile) -> List[str]:
         audio_format = self.job.settings.get('format', 'aac')
-        codecs = {'mp3': 'libmp3lame', 'flac': 'flac', 'ogg': 'libvorbis'}
+        codec_name, encoder = AUDIO_FORMATS.get(audio_format, AUDIO_FORMATS['aac'])
         # Use filename from MediaFile object for the output to respect changes from renamer tab
         output_stem = Path(media_file.filename).stem
         output_path = self.job.output_directory / f"{output_stem}.{audio_format}"
-        ffmpeg_path = get_ffmpeg_path()
 
-        cmd = [ffmpeg_path, '-i', str(media_file.path), '-vn']
+        # Extract the first audio stream, the one whose codec is checked below; left to itself
+        # ffmpeg would pick the stream with the most channels, which may be another track
+        cmd = [self.ffmpeg_path, '-i', str(media_file.path), '-map', '0:a:0']
 
-        # This logic was flawed. If the source is not AAC, we can't 'copy' it to an AAC container.
-        # Let's just always specify the AAC codec for simplicity and correctness.
-        if audio_format == 'aac':
-            cmd.extend(['-acodec', 'aac'])
+        # Copy the stream untouched when it is already in the target codec; re-encode otherwise.
+        if self._source_audio_codec(media_file) == codec_name:
+            cmd.extend(['-c:a', 'copy'])
         else:
-            codec = codecs.get(audio_format)
-            if codec:
-                cmd.extend(['-acodec', codec])
+            cmd.extend(['-c:a', encoder])
         cmd.extend(['-y', str(output_path)])
         return cmd
 
     def extract_audio(self):
         total_files = len(self.job.input_files)
-        for i, media_file in enumerate(self.job.input_files):
-            if self.is_cancelled:
-                break
-
-            self.status_updated.emit(f"({i+1}/{total_files}) Extracting from {media_file.filename}...")
-            duration = self._get_duration(media_file.path)
-            if duration == 0:
-                self.status_updated.emit(f"Could not get duration for {media_file.filename}. Progress will not be shown.")
-
-            cmd = self.build_extract_audio_cmd(media_file)
-
-            try:
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, universal_newlines=True)
-
-                time_regex = re.compile(r"time=(\d{2}:\d{2}:\d{2}\.\d{2})")
-
-                for line in iter(process.stderr.readline, ""):
-                    if self.is_cancelled:
-                        process.terminate()
-                        break
-
-                    match = time_regex.search(line)
-                    if match and duration > 0:
-                        elapsed_time = self._time_str_to_seconds(match.group(1))
-                        progress = int((elapsed_time / duration) * 100)
-                        # Scale progress to the overall job progress
-                        overall_progress = int(((i + progress / 100) / total_files) * 100)
-                        self.progress_updated.emit(overall_progress)
-
-                process.wait()
-
-                if process.returncode != 0 and not self.is_cancelled:
-                    error_message = f"Failed to extract from {media_file.filename}.\n"
-                    self.job_completed.emit(error_message, False)
-                    return
-
-            except Exception as e:
-                self.job_completed.emit(f"An error occurred with {media_file.filename}: {str(e)}", False)
-                return
+        tasks = [
+            FFmpegTask(
+                i, media_file, self.build_extract_audio_cmd(media_file),
+                f"({i+1}/{total_files}) Extracting from {media_file.filename}...",
+                f"Failed to extract from {media_file.filename}."
+            )
+            for i, media_file in enumerate(self.job.input_files)
+        ]
+        self._run_tasks(tasks, "Audio extraction completed!")
 
-        if not self.is_cancelled:
-            self.progress_updated.emit(100)
-            self.job_completed.emit("Audio extraction completed!", True)
+    def _input_args(self, paths: List) -> List[str]:
+        """
+        Builds the '-i' arguments for every input file.
+        """
+        return [arg for path in paths for arg in ('-i', str(path))]
 
     def build_merge_audio_cmd(self, video_file: MediaFile, matching_audio: List[str], languages: List[str]) -> List[str]:
-        ffmpeg_path = get_ffmpeg_path()
         output_path = self.job.output_directory / f"{video_file.path.stem}_merged.mkv"
-        cmd = [ffmpeg_path, '-i', str(video_file.path)]
-        for audio_path in matching_audio:
-            cmd.extend(['-i', str(audio_path)])
+        cmd = [self.ffmpeg_path] + self._input_args([video_file.path] + list(matching_audio))
 
         if self.job.settings.get('preserve_original', True):
-            # Map all streams from video, but specifically exclude its audio streams
-            cmd.extend(['-map', '0', '-map', '-0:a'])
+            # Map all streams from video, but specifically exclude its audio and data streams
+            cmd.extend(['-map', '0', '-map', '-0:a', '-map', '-0:d?'])
         else:
             # Map only video and subtitle streams
             cmd.extend(['-map', '0:v', '-map', '0:s?'])
 
         # Map the new audio streams
-        for i in range(len(matching_audio)):
-            cmd.extend(['-map', f'{i + 1}:a'])
+        cmd += [arg for i in range(len(matching_audio)) for arg in ('-map', f'{i + 1}:a')]
+        cmd.extend(['-map_metadata', '0', '-map_chapters', '0'])
 
         # Add language metadata to the new audio streams
-        for i, lang in enumerate(languages):
-            cmd.extend([f'-metadata:s:a:{i}', f'language={lang}'])
+        cmd += [arg for i, lang in enumerate(languages) for arg in (f'-metadata:s:a:{i}', f'language={lang}')]
 
         cmd.extend(['-c', 'copy', '-y', str(output_path)])
         return cmd
 
     def merge_audio(self):
         total_files = len(self.job.input_files)
-        for i, video_file in enumerate(self.job.input_files):
-            if self.is_cancelled:
-                break
-
-            self.status_updated.emit(f"({i+1}/{total_files}) Merging audio into {video_file.filename}...")
-
-            audio_files = self.job.settings.get('audio_files', [])
-            matching_audio = [
-                audio_path for audio_path in audio_files
-                if video_file.path.stem.lower() in Path(audio_path).stem.lower() or
-                   Path(audio_path).stem.lower() in video_file.path.stem.lower()
-            ]
-
+        settings = self.job.settings
+        audio_files = settings.get('audio_files', [])
+        languages = settings.get('languages') or ['spa']
+        last = len(languages) - 1
+        audio_languages = {path: languages[min(j, last)] for j, path in enumerate(audio_files)}
+        all_matches = match_files_to_videos([video_file.path for video_file in self.job.input_files], audio_files)
+        tasks = []
+        for i, (video_file, matching_audio) in enumerate(zip(self.job.input_files, all_matches)):
             if not matching_audio:
                 self.status_updated.emit(f"No matching audio found for {video_file.filename}")
                 continue
 
-            duration = self._get_duration(video_file.path)
-            if duration == 0:
-                self.status_updated.emit(f"Could not get duration for {video_file.filename}. Progress will not be shown.")
-
-            cmd = self._build_merge_audio_cmd(video_file, matching_audio)
-
-            try:
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, universal_newlines=True)
-                time_regex = re.compile(r"time=(\d{2}:\d{2}:\d{2}\.\d{2})")
-
-                for line in iter(process.stderr.readline, ""):
-                    if self.is_cancelled:
-                        process.terminate()
-                        break
-
-                    match = time_regex.search(line)
-                    if match and duration > 0:
-                        elapsed_time = self._time_str_to_seconds(match.group(1))
-                        progress = int((elapsed_time / duration) * 100)
-                        overall_progress = int(((i + progress / 100) / total_files) * 100)
-                        self.progress_updated.emit(overall_progress)
+            matching_languages = [audio_languages[audio_path] for audio_path in matching_audio]
+            tasks.append(FFmpegTask(
+                i, video_file, self.build_merge_audio_cmd(video_file, matching_audio, matching_languages),
+                f"({i+1}/{total_files}) Merging audio into {video_file.filename}...",
+                f"Failed to merge audio for {video_file.filename}"
+            ))
 
-                process.wait()
-
-                if process.returncode != 0 and not self.is_cancelled:
-                    self.job_completed.emit(f"Failed to merge audio for {video_file.filename}", False)
-                    return
-
-            except Exception as e:
-                self.job_completed.emit(f"Error processing {video_file.filename}: {str(e)}", False)
-                return
-
-        if not self.is_cancelled:
-            self.progress_updated.emit(100)
-            self.job_completed.emit("Audio merging completed!", True)
+        self._run_tasks(tasks, "Audio merging completed!")
 
     def build_embed_subtitles_cmd(self, video_file: MediaFile, matching_subs: List[str], languages: List[str]) -> List[str]:
-        ffmpeg_path = get_ffmpeg_path()
         output_path = self.job.output_directory / f"{video_file.path.stem}_subtitled.mkv"
 
         # Handle hard vs soft subtitles
@@ -241,28 +365,23 @@ class FFmpegWorker(QThread):
             # Need to escape path for ffmpeg filter
             escaped_sub_path = str(matching_subs[0]).replace('\\', '/').replace(':', '\\:')
             return [
-                ffmpeg_path, '-i', str(video_file.path),
+                self.ffmpeg_path, '-i', str(video_file.path),
                 '-vf', f"subtitles='{escaped_sub_path}'",
                 '-y', str(output_path)
             ]
 
         # Soft subtitles logic
-        cmd = [ffmpeg_path, '-i', str(video_file.path)]
-        for sub_path in matching_subs:
-            cmd.extend(['-i', str(sub_path)])
+        cmd = [self.ffmpeg_path] + self._input_args([video_file.path] + list(matching_subs))
 
-        # Map all streams from original video and all new subtitle streams
-        cmd.extend(['-map', '0', '-map', '1'])
-        if len(matching_subs) > 1:
-             for i in range(1, len(matching_subs)):
-                 cmd.extend(['-map', f'{i+1}'])
+        # Map all streams from original video and all new subtitle streams, minus the video's data streams
+        cmd += [arg for i in range(len(matching_subs) + 1) for arg in ('-map', str(i))]
+        cmd.extend(['-map', '-0:d?', '-map_metadata', '0', '-map_chapters', '0'])
 
         # Copy all streams, but specify subtitle codec
         cmd.extend(['-c', 'copy', '-c:s', 'mov_text'])
 
         # Add language metadata
-        for i, lang in enumerate(languages):
-            cmd.extend([f'-metadata:s:s:{i}', f'language={lang}'])
+        cmd += [arg for i, lang in enumerate(languages) for arg in (f'-metadata:s:s:{i}', f'language={lang}')]
 
         # Set first subtitle as default if checked
         if self.job.settings.get('default_subtitle', False) and languages:
@@ -273,62 +392,49 @@ class FFmpegWorker(QThread):
 
     def embed_subtitles(self):
         total_files = len(self.job.input_files)
-        for i, video_file in enumerate(self.job.input_files):
-            if self.is_cancelled:
-                break
-
-            self.status_updated.emit(f"({i+1}/{total_files}) Embedding subtitles in {video_file.filename}...")
-
-            subtitle_files = self.job.settings.get('subtitle_files', [])
-            matching_subs = [
-                sub_path for sub_path in subtitle_files
-                if video_file.path.stem.lower() in Path(sub_path).stem.lower() or
-                   Path(sub_path).stem.lower() in video_file.path.stem.lower()
-            ]
-
+        settings = self.job.settings
+        subtitle_files = settings.get('subtitle_files', [])
+        languages = settings.get('languages') or ['spa']
+        last = len(languages) - 1
+        subtitle_languages = {path: languages[min(j, last)] for j, path in enumerate(subtitle_files)}
+        all_matches = match_files_to_videos([video_file.path for video_file in self.job.input_files], subtitle_files)
+        tasks = []
+        for i, (video_file, matching_subs) in enumerate(zip(self.job.input_files, all_matches)):
             if not matching_subs:
                 self.status_updated.emit(f"No matching subtitles found for {video_file.filename}")
                 continue
 
-            duration = self._get_duration(video_file.path)
-            if duration == 0:
-                self.status_updated.emit(f"Could not get duration for {video_file.filename}. Progress will not be shown.")
-
-            cmd = self._build_embed_subtitles_cmd(video_file, matching_subs)
-
-            try:
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, universal_newlines=True)
-                time_regex = re.compile(r"time=(\d{2}:\d{2}:\d{2}\.\d{2})")
+            matching_languages = [subtitle_languages[sub_path] for sub_path in matching_subs]
+            tasks.append(FFmpegTask(
+                i, video_file, self.build_embed_subtitles_cmd(video_file, matching_subs, matching_languages),
+                f"({i+1}/{total_files}) Embedding subtitles in {video_file.filename}...",
+                f"Failed to embed subtitles for {video_file.filename}"
+            ))
 
-                for line in iter(process.stderr.readline, ""):
-                    if self.is_cancelled:
-                        process.terminate()
-                        break
+        self._run_tasks(tasks, "Subtitle embedding completed!")
 
-                    match = time_regex.search(line)
-                    if match and duration > 0:
-                        elapsed_time = self._time_str_to_seconds(match.group(1))
-                        progress = int((elapsed_time / duration) * 100)
-                        overall_progress = int(((i + progress / 100) / total_files) * 100)
-                        self.progress_updated.emit(overall_progress)
+    def _run_tasks(self, tasks: List[FFmpegTask], success_message: str):
+        """Runs the per-file tasks concurrently and reports the aggregated result."""
+        max_concurrent = self.job.settings.get('max_threads') or get_max_threads()
+        runner = FFmpegProcessRunner(self, tasks, max_concurrent)
+        runner.run()
 
-                process.wait()
+        if self.is_cancelled:
+            return
+        if runner.failures:
+            self.job_completed.emit("\n".join(runner.failures), False)
+            return
 
-                if process.returncode != 0 and not self.is_cancelled:
-                    self.job_completed.emit(f"Failed to embed subtitles for {video_file.filename}", False)
-                    return
-
-            except Exception as e:
-                self.job_completed.emit(f"Error processing {video_file.filename}: {str(e)}", False)
-                return
-
-        if not self.is_cancelled:
-            self.progress_updated.emit(100)
-            self.job_completed.emit("Subtitle embedding completed!", True)
+        self.progress_updated.emit(100)
+        self.job_completed.emit(success_message, True)
 
     def bulk_rename(self):
         total_files = len(self.job.input_files)
         renamed_count = 0
+        settings = self.job.settings
+        show_name = settings.get('show_name', 'Unknown Show')
+        use_api = settings.get('use_api', False)
+        preview_mode = settings.get('preview_mode', False)
 
         for i, media_file in enumerate(self.job.input_files):
             if self.is_cancelled:
@@ -340,26 +446,25 @@ class FFmpegWorker(QThread):
             season, episode = self.extract_season_episode(media_file.filename)
 
             if season and episode:
-                # Get show info from settings
-                show_name = self.job.settings.get('show_name', 'Unknown Show')
-                use_api = self.job.settings.get('use_api', False)
                 episode_title = ""
 
                 if use_api:
                     episode_title = self.get_episode_title(show_name, season, episode)
 
+                # Work on plain strings from here on; pathlib adds nothing for a straight rename
+                src = os.fspath(media_file.path)
+                parent_str, base_name = os.path.split(src)
+
                 # Build new filename
                 new_name = self.build_new_filename(
                     show_name, season, episode, episode_title,
-                    media_file.path.suffix, self.job.settings
+                    os.path.splitext(base_name)[1], settings
                 )
 
-                new_path = media_file.path.parent / new_name
-
                 # Rename the file
                 try:
-                    if not self.job.settings.get('preview_mode', False):
-                        media_file.path.rename(new_path)
+                    if not preview_mode:
+                        os.replace(src, os.path.join(parent_str, new_name))
                     renamed_count += 1
                     self.status_updated.emit(f"Renamed: {media_file.filename} → {new_name}")
                 except Exception as e:
@@ -369,27 +474,26 @@ class FFmpegWorker(QThread):
             self.progress_updated.emit(progress)
 
         if not self.is_cancelled:
-            mode = "Preview completed" if self.job.settings.get('preview_mode',
-                                                                 False) else f"Renamed {renamed_count} files"
+            mode = "Preview completed" if preview_mode else f"Renamed {renamed_count} files"
             self.job_completed.emit(f"Bulk renaming completed! {mode}", True)
 
     def extract_season_episode(self, filename: str) -> Tuple[Optional[int], Optional[int]]:
         """Extract season and episode numbers from filename"""
-        patterns = [
-            r'[Ss](\d{1,2})[Ee](\d{1,2})',  # S01E01
-            r'(\d{1,2})x(\d{1,2})',  # 1x01
-            r'Season\s*(\d{1,2}).*Episode\s*(\d{1,2})',  # Season 1 Episode 1
-            r'(\d{1,2})\s*-\s*(\d{1,2})',  # 1-01
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, filename, re.IGNORECASE)
+        for pattern in self._SE_PATTERNS:
+            match = pattern.search(filename)
             if match:
                 return int(match.group(1)), int(match.group(2))
 
         return None, None
 
     def get_episode_title(self, show_name: str, season: int, episode: int) -> str:
+        """Fetch episode title, reusing earlier lookups from the same batch"""
+        key = (show_name, season, episode)
+        if key not in self._episode_titles:
+            self._episode_titles[key] = self._fetch_episode_title(show_name, season, episode)
+        return self._episode_titles[key]
+
+    def _fetch_episode_title(self, show_name: str, season: int, episode: int) -> str:
         """Fetch episode title from TMDb (simplified mock implementation)"""
         try:
             # In a real implementation, you'd use the TMDb API
@@ -404,10 +508,8 @@ class FFmpegWorker(QThread):
         template = settings.get('filename_template', '{name} - S{season:02d}E{episode:02d} - {title}{ext}')
 
         # Clean up names
-        clean_name = re.sub(r'[<>:"/\\|?*]', '', show_name)
-        clean_title = re.sub(r'[<>:"/\\|?*]', '', episode_title) if episode_title else ''
-        year_match = re.search(r'\((\d{4})\)', clean_name)
-        year = year_match.group(1) if year_match else ""
+        clean_name, year = clean_show_name(show_name)
+        clean_title = sanitize_filename_part(episode_title) if episode_title else ''
 
         try:
             return template.format(
@@ -1,10 +1,22 @@
+import json
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch, MagicMock, PropertyMock
 
 from echomux.api_client import ApiClient
 
 class TestApiClient(unittest.TestCase):
 
+    def setUp(self):
+        # Keep the lookup cache file of each test in its own temporary folder
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_file = Path(temp_dir.name) / "tmdb.json"
+        cache_patcher = patch.object(ApiClient, 'CACHE_FILE', self.cache_file)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
     @patch('echomux.api_client.TMDb')
     @patch('echomux.api_client.QSettings')
     def test_init_no_api_key(self, mock_qsettings, mock_tmdb):
@@ -123,5 +135,149 @@ class TestApiClient(unittest.TestCase):
         # Assert
         self.assertIsNone(title)
 
+    @patch('echomux.api_client.TMDb')
+    @patch('echomux.api_client.TV')
+    @patch('echomux.api_client.QSettings')
+    def test_lookups_are_cached(self, mock_qsettings, mock_tv, mock_tmdb):
+        # Setup
+        mock_settings_instance = mock_qsettings.return_value
+        mock_settings_instance.value.return_value = "fake_api_key"
+        type(mock_tmdb.return_value).api_key = PropertyMock(return_value="fake_api_key")
+
+        mock_tv_instance = mock_tv.return_value
+        mock_show = MagicMock()
+        mock_show.id = 123
+        mock_tv_instance.search.return_value = [mock_show]
+        mock_tv_instance.episode_details.return_value = {'name': 'The Pilot'}
+
+        client = ApiClient()
+
+        # Action
+        for _ in range(3):
+            show = client.search_show("Test Show")
+            title = client.get_episode_title(show.id, 1, 1)
+
+        # Assert
+        self.assertEqual(title, "The Pilot")
+        mock_tv.assert_called_once()
+        mock_tv_instance.search.assert_called_once_with("Test Show")
+        mock_tv_instance.episode_details.assert_called_once_with(123, 1, 1)
+
+    @patch('echomux.api_client.TMDb')
+    @patch('echomux.api_client.TV')
+    @patch('echomux.api_client.QSettings')
+    def test_get_episode_titles_bulk(self, mock_qsettings, mock_tv, mock_tmdb):
+        # Setup
+        mock_settings_instance = mock_qsettings.return_value
+        mock_settings_instance.value.return_value = "fake_api_key"
+        type(mock_tmdb.return_value).api_key = PropertyMock(return_value="fake_api_key")
+
+        mock_tv_instance = mock_tv.return_value
+        mock_tv_instance.episode_details.side_effect = (
+            lambda show_id, season, episode: {'name': f"Episode {episode}"} if episode < 3 else None
+        )
+
+        client = ApiClient()
+
+        # Action
+        titles = client.get_episode_titles_bulk(123, [(1, 1), (1, 2), (1, 3), (1, 1)])
+
+        # Assert
+        self.assertEqual(titles, {(1, 1): "Episode 1", (1, 2): "Episode 2", (1, 3): None})
+        self.assertEqual(mock_tv_instance.episode_details.call_count, 3)
+
+    @patch('echomux.api_client.TMDb')
+    @patch('echomux.api_client.TV')
+    @patch('echomux.api_client.QSettings')
+    def test_search_show_reuses_saved_results(self, mock_qsettings, mock_tv, mock_tmdb):
+        # Setup
+        mock_settings_instance = mock_qsettings.return_value
+        mock_settings_instance.value.return_value = "fake_api_key"
+        type(mock_tmdb.return_value).api_key = PropertyMock(return_value="fake_api_key")
+
+        mock_tv_instance = mock_tv.return_value
+        mock_show = MagicMock()
+        mock_show.id = 123
+        mock_show.name = "Test Show"
+        mock_tv_instance.search.return_value = [mock_show]
+
+        # Action
+        first = ApiClient().search_show("Test Show")
+        second = ApiClient().search_show("  test   SHOW ")
+
+        # Assert
+        self.assertEqual(first.id, 123)
+        self.assertEqual(second, first)
+        mock_tv_instance.search.assert_called_once_with("Test Show")
+
+    @patch('echomux.api_client.TMDb')
+    @patch('echomux.api_client.TV')
+    @patch('echomux.api_client.QSettings')
+    def test_episode_titles_reuse_saved_results(self, mock_qsettings, mock_tv, mock_tmdb):
+        # Setup
+        mock_settings_instance = mock_qsettings.return_value
+        mock_settings_instance.value.return_value = "fake_api_key"
+        type(mock_tmdb.return_value).api_key = PropertyMock(return_value="fake_api_key")
+
+        mock_tv_instance = mock_tv.return_value
+        mock_tv_instance.episode_details.side_effect = (
+            lambda show_id, season, episode: {'name': f"Episode {episode}"} if episode < 3 else None
+        )
+
+        # Action
+        first = ApiClient().get_episode_titles_bulk(123, [(1, 1), (1, 2), (1, 3)])
+        second = ApiClient().get_episode_titles_bulk(123, [(1, 1), (1, 2), (1, 3)])
+
+        # Assert
+        self.assertEqual(first, second)
+        saved = json.loads(self.cache_file.read_text(encoding='utf-8'))
+        self.assertEqual(saved["episode_titles"], {"123/1/1": "Episode 1", "123/1/2": "Episode 2"})
+        # Only the episode TMDB did not know is looked up again
+        self.assertEqual(mock_tv_instance.episode_details.call_count, 4)
+
+    @patch('echomux.api_client.TMDb')
+    @patch('echomux.api_client.TV')
+    @patch('echomux.api_client.QSettings')
+    def test_saved_titles_are_capped(self, mock_qsettings, mock_tv, mock_tmdb):
+        # Setup
+        mock_settings_instance = mock_qsettings.return_value
+        mock_settings_instance.value.return_value = "fake_api_key"
+        type(mock_tmdb.return_value).api_key = PropertyMock(return_value="fake_api_key")
+
+        mock_tv_instance = mock_tv.return_value
+        mock_tv_instance.episode_details.side_effect = lambda show_id, season, episode: {'name': f"Episode {episode}"}
+
+        # Action
+        with patch.object(ApiClient, 'MAX_SAVED_TITLES', 2):
+            client = ApiClient()
+            for episode in range(1, 4):
+                client.get_episode_title(123, 1, episode)
+
+        # Assert
+        saved = json.loads(self.cache_file.read_text(encoding='utf-8'))
+        self.assertEqual(saved["episode_titles"], {"123/1/2": "Episode 2", "123/1/3": "Episode 3"})
+
+    @patch('echomux.api_client.TMDb')
+    @patch('echomux.api_client.TV')
+    @patch('echomux.api_client.QSettings')
+    def test_instance_is_shared_and_reloads_key(self, mock_qsettings, mock_tv, mock_tmdb):
+        # Setup
+        stored = {"tmdb_api_key": ""}
+        mock_settings_instance = mock_qsettings.return_value
+        mock_settings_instance.value.side_effect = lambda key, default=None, type=None: stored.get(key, default)
+
+        # Action
+        with patch.object(ApiClient, '_instance', None):
+            client = ApiClient.instance()
+            configured_before = client.is_configured()
+            stored["tmdb_api_key"] = "fake_api_key"
+            client.reload_settings()
+
+            # Assert
+            self.assertIs(ApiClient.instance(), client)
+        self.assertFalse(configured_before)
+        self.assertTrue(client.is_configured())
+        mock_qsettings.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
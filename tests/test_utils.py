@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 import tempfile
 import pytest
+from unittest.mock import patch
 
 from echomux.utils import process_paths
 
@@ -52,6 +53,20 @@ def test_process_paths_with_directory():
         assert str(subdir / "image.jpg") not in result
 
 
+def test_process_paths_recurses_into_directories_named_like_files():
+    """
+    Tests that a directory with an allowed extension is searched, not returned.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        nested = Path(tmpdir) / "extras.mkv" / "deeper"
+        nested.mkdir(parents=True)
+        (nested / "clip.mkv").touch()
+
+        result = process_paths([tmpdir], ['.mkv'])
+
+        assert result == [str(nested / "clip.mkv")]
+
+
 def test_process_paths_mixed_content():
     """
     Tests a mix of files and directories as input.
@@ -107,6 +122,7 @@ def test_process_paths_empty():
     ("S01E.mp4", None, None),
     ("S01E999.mkv", 1, 999), # It should parse numbers, even if they are large
     ("series.10-11.mkv", 10, 11),
+    ("2019-2020 Show S03E07.mkv", 3, 7), # S01E02 style takes priority over an earlier 1-02 match
 ])
 def test_extract_season_episode(filename, expected_season, expected_episode):
     """
@@ -116,3 +132,233 @@ def test_extract_season_episode(filename, expected_season, expected_episode):
     season, episode = extract_season_episode(filename)
     assert season == expected_season
     assert episode == expected_episode
+
+
+def test_match_files_to_videos():
+    """
+    Tests that episodic files are paired by season/episode and other files by name.
+    """
+    from echomux.utils import match_files_to_videos
+    videos = [
+        Path("/v/Show_S01E01.mkv"), Path("/v/Show_S01E10.mkv"), Path("/v/Movie.mkv"),
+        Path("/v/The.Long.Title.2019.mkv"), Path("/v/Unrelated.mkv"),
+    ]
+    candidates = [
+        "/a/show.s01e10.eng.aac", "/a/Show_S01E01.aac", "/a/movie.ger.mp3", "/a/movie.mp3",
+        "/a/The Long Titel (2019).ac3",
+    ]
+
+    result = match_files_to_videos(videos, candidates)
+
+    assert result == [
+        ["/a/Show_S01E01.aac"],
+        ["/a/show.s01e10.eng.aac"],
+        ["/a/movie.ger.mp3", "/a/movie.mp3"],
+        ["/a/The Long Titel (2019).ac3"],
+        [],
+    ]
+
+
+def test_match_files_to_videos_with_prebuilt_index():
+    """
+    Tests that a prebuilt candidate index gives the same matches as building one per call.
+    """
+    from echomux.utils import CandidateIndex, match_files_to_videos
+    candidates = ["/a/Show_S01E01.aac", "/a/Show_S01E02.aac", "/a/movie.mp3"]
+    index = CandidateIndex(candidates)
+
+    first = match_files_to_videos([Path("/v/Show_S01E02.mkv")], candidates, index)
+    second = match_files_to_videos([Path("/v/Movie.mkv")], candidates, index)
+
+    assert first == [["/a/Show_S01E02.aac"]]
+    assert second == [["/a/movie.mp3"]]
+    assert index.paths == tuple(candidates)
+
+
+def test_ffprobe_cache_reuses_results_until_file_changes():
+    """
+    Tests that cached probe results survive a reload and are invalidated by file changes.
+    """
+    from echomux.utils import FFprobeCache
+    with tempfile.TemporaryDirectory() as tmpdir:
+        media = Path(tmpdir) / "video.mkv"
+        media.write_bytes(b"1234")
+        cache_file = Path(tmpdir) / "cache" / "probe.json"
+        info = {'format': {'duration': '12.5'}, 'streams': []}
+
+        with patch('echomux.utils.run_ffprobe', return_value=info) as mock_probe:
+            cache = FFprobeCache(cache_file)
+            assert cache.get(str(media)) == info
+            assert cache.get(str(media)) == info
+            cache.save()
+
+            reloaded = FFprobeCache(cache_file)
+            assert reloaded.get(str(media)) == info
+            assert mock_probe.call_count == 1
+
+            media.write_bytes(b"123456")
+            reloaded.get(str(media))
+            assert mock_probe.call_count == 2
+
+
+def test_ffprobe_cache_discards_stale_files_and_entries():
+    """
+    Tests that a cache written for other probe fields is ignored and deleted files are pruned on save.
+    """
+    import json
+    from echomux.utils import FFprobeCache, PROBE_ENTRIES
+    with tempfile.TemporaryDirectory() as tmpdir:
+        kept, deleted = Path(tmpdir) / "kept.mkv", Path(tmpdir) / "deleted.mkv"
+        kept.write_bytes(b"1234")
+        deleted.write_bytes(b"1234")
+        cache_file = Path(tmpdir) / "probe.json"
+        stat = os.stat(kept)
+        old_entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'info': {'format': {}}}
+        cache_file.write_text(json.dumps({'probe_entries': 'format=duration', 'entries': {str(kept): old_entry}}))
+        info = {'format': {'duration': '12.5'}, 'streams': []}
+
+        with patch('echomux.utils.run_ffprobe', return_value=info) as mock_probe:
+            cache = FFprobeCache(cache_file)
+            assert cache.get(str(kept)) == info
+            cache.get(str(deleted))
+            assert mock_probe.call_count == 2
+            deleted.unlink()
+            cache.save()
+
+        saved = json.loads(cache_file.read_text())
+        assert saved['probe_entries'] == PROBE_ENTRIES
+        assert list(saved['entries']) == [str(kept)]
+
+
+def test_run_ffprobe_requests_only_used_fields():
+    """
+    Tests that ffprobe is asked for just the fields the app reads and its JSON is parsed.
+    """
+    from unittest.mock import MagicMock
+    from echomux.utils import run_ffprobe
+    stdout = '{"streams": [{"index": 1, "codec_name": "aac", "codec_type": "audio"}], "format": {"duration": "1.5"}}'
+    with patch('subprocess.run', return_value=MagicMock(stdout=stdout)) as mock_run:
+        info = run_ffprobe("video.mkv")
+
+    cmd = mock_run.call_args[0][0]
+    assert cmd[cmd.index('-show_entries') + 1].startswith('format=duration:stream=')
+    assert '-show_streams' not in cmd
+    assert info['format']['duration'] == "1.5"
+    assert info['streams'][0]['codec_name'] == "aac"
+
+
+@pytest.mark.parametrize("filename, expected_code", [
+    ("Show.S01E01.eng.srt", "eng"),
+    ("Show.S01E01.Spanish.srt", "spa"),
+    ("Movie - french.ass", "fra"),
+    ("Movie.fre.srt", "fra"),
+    ("Movie.English.forced.jpn.srt", "jpn"),
+    ("Bengal.Tigers.srt", None),
+    ("Show.S01E01.srt", None),
+    ("Chi-Raq.aac", None),
+    ("Movie.Por.Favor.srt", None),
+    ("Hindi.Medium.srt", None),
+    ("Movie.eng.forced.srt", None),
+])
+def test_detect_language(filename, expected_code):
+    """
+    Tests language detection from filename tags.
+    """
+    from echomux.utils import detect_language, DEFAULT_LANGUAGES
+    assert detect_language(filename, DEFAULT_LANGUAGES) == expected_code
+
+
+@pytest.mark.parametrize("show_name, expected", [
+    ("Show: Name (2008)", ("Show Name (2008)", "2008")),
+    ('What/If? <Live>', ("WhatIf Live", "")),
+    ("Plain Show", ("Plain Show", "")),
+])
+def test_clean_show_name(show_name, expected):
+    """
+    Tests that show names lose filename-invalid characters and expose their year.
+    """
+    from echomux.utils import clean_show_name
+    assert clean_show_name(show_name) == expected
+
+
+def test_analyze_media_files_keeps_order_and_probes_once():
+    """
+    Tests that batch analysis returns results in input order and probes repeated paths once.
+    """
+    from echomux.utils import analyze_media_files
+    infos = {"a.mkv": {"streams": []}, "b.mkv": None}
+    with patch('echomux.utils.analyze_media_file', side_effect=infos.get) as mock_analyze:
+        results = analyze_media_files(["b.mkv", "a.mkv", "b.mkv"])
+
+    assert results == [None, infos["a.mkv"], None]
+    assert mock_analyze.call_count == 2
+    assert analyze_media_files([]) == []
+
+
+def test_path_key_treats_equivalent_spellings_as_one_file():
+    """
+    Tests that different spellings of the same path share one duplicate-check key.
+    """
+    from echomux.utils import path_key
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plain = os.path.join(tmpdir, "video.mkv")
+        dotted = os.path.join(tmpdir, ".", "sub", "..", "video.mkv")
+
+        assert path_key(plain) == path_key(dotted) == path_key(Path(plain))
+        assert path_key(plain) != path_key(os.path.join(tmpdir, "other.mkv"))
+
+
+def test_language_labels_follow_languages():
+    """
+    Tests that the cached display labels cover every language in order and refresh with the language list.
+    """
+    from echomux.utils import get_languages, get_language_labels
+    with patch('PyQt6.QtCore.QSettings') as mock_settings:
+        mock_settings.return_value.value.return_value = [["Klingon", "tlh"]]
+        get_languages.cache_clear()
+        get_language_labels.cache_clear()
+        try:
+            languages = get_languages()
+            labels = get_language_labels()
+
+            assert isinstance(languages, tuple)
+            assert list(labels) == [code for _, code in languages]
+            assert labels["tlh"] == "Klingon (tlh)"
+            assert get_language_labels() is labels
+        finally:
+            get_languages.cache_clear()
+            get_language_labels.cache_clear()
+
+
+def test_match_files_to_videos_keeps_shows_apart():
+    """
+    Tests that episodes of different shows sharing an episode number are not paired with each other.
+    """
+    from echomux.utils import match_files_to_videos
+    videos = [Path("/v/ShowA.S01E01.mkv"), Path("/v/ShowB.S01E01.mkv"), Path("/v/Show.Name.S01E02.1080p.mkv")]
+    candidates = ["/a/ShowA.S01E01.aac", "/a/ShowB.S01E01.aac", "/a/S01E02.eng.aac"]
+
+    result = match_files_to_videos(videos, candidates)
+
+    assert result == [["/a/ShowA.S01E01.aac"], ["/a/ShowB.S01E01.aac"], ["/a/S01E02.eng.aac"]]
+
+
+def test_match_files_to_videos_keeps_numbered_files_apart():
+    """
+    Tests that non-episodic files whose names differ only in their numbers are paired one to one.
+    """
+    from echomux.utils import match_files_to_videos
+    videos = [Path("/v/Lecture 01.mp4"), Path("/v/Lecture 02.mp4"), Path("/v/Talk Part 1.mp4")]
+    candidates = ["/a/Lecture 02.aac", "/a/Lecture 01.aac", "/a/Talk Prt 2.aac"]
+
+    result = match_files_to_videos(videos, candidates)
+
+    assert result == [["/a/Lecture 01.aac"], ["/a/Lecture 02.aac"], []]
+
+
+def test_match_files_to_videos_needs_the_same_episode():
+    """
+    Tests that a video with a season/episode is not paired with another episode whose name it contains.
+    """
+    from echomux.utils import match_files_to_videos
+    assert match_files_to_videos([Path("Show S01E10.mkv")], ["Show S01E1.aac"]) == [[]]
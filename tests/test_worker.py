@@ -1,12 +1,23 @@
+import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch, MagicMock
 
-from echomux.worker import ProcessingJob, FFmpegWorker, MediaFile
+from PyQt6.QtCore import QCoreApplication
 
+from echomux.worker import ProcessingJob, FFmpegWorker, MediaFile, MediaAnalysisWorker, EpisodeTitleWorker
+
+@patch('echomux.worker.resolve_executable', new=lambda name: name)
 class TestFFmpegWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # ffmpeg processes are driven by a Qt event loop
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
     def test_build_extract_command_aac(self):
         # Setup
-        input_file = MediaFile(path=Path("/test/video.mkv"), filename="video.mkv")
+        input_file = MediaFile(path=Path("/test/video.mkv"), filename="video.mkv",
+                               audio_tracks=[{'codec_name': 'ac3'}])
         job = ProcessingJob(
             input_files=[input_file],
             output_directory=Path("/test/output"),
@@ -20,14 +31,15 @@ class TestFFmpegWorker(unittest.TestCase):
 
         # Assert
         expected_command = [
-            'ffmpeg', '-i', '/test/video.mkv', '-vn', '-acodec', 'aac',
+            'ffmpeg', '-i', '/test/video.mkv', '-map', '0:a:0', '-c:a', 'aac',
             '-y', '/test/output/video.aac'
         ]
         self.assertEqual(command, expected_command)
 
     def test_build_extract_command_mp3(self):
         # Setup
-        input_file = MediaFile(path=Path("/test/video.mp4"), filename="video.mp4")
+        input_file = MediaFile(path=Path("/test/video.mp4"), filename="video.mp4",
+                               audio_tracks=[{'codec_name': 'aac'}])
         job = ProcessingJob(
             input_files=[input_file],
             output_directory=Path("/test/output"),
@@ -41,11 +53,56 @@ class TestFFmpegWorker(unittest.TestCase):
 
         # Assert
         expected_command = [
-            'ffmpeg', '-i', '/test/video.mp4', '-vn', '-acodec', 'libmp3lame',
+            'ffmpeg', '-i', '/test/video.mp4', '-map', '0:a:0', '-c:a', 'libmp3lame',
             '-y', '/test/output/video.mp3'
         ]
         self.assertEqual(command, expected_command)
 
+    def test_build_extract_command_copies_matching_codec(self):
+        # Setup
+        input_file = MediaFile(path=Path("/test/video.mkv"), filename="video.mkv")
+        job = ProcessingJob(
+            input_files=[input_file],
+            output_directory=Path("/test/output"),
+            job_type='extract',
+            settings={'format': 'ogg'}
+        )
+        worker = FFmpegWorker(job)
+
+        # Action
+        with patch.object(FFmpegWorker, '_probe_audio_codec', return_value='vorbis') as mock_probe:
+            command = worker.build_extract_audio_cmd(input_file)
+
+        # Assert
+        mock_probe.assert_called_once_with(Path("/test/video.mkv"))
+        expected_command = [
+            'ffmpeg', '-i', '/test/video.mkv', '-map', '0:a:0', '-c:a', 'copy',
+            '-y', '/test/output/video.ogg'
+        ]
+        self.assertEqual(command, expected_command)
+
+    def test_build_extract_command_checks_extracted_track(self):
+        # Setup
+        input_file = MediaFile(path=Path("/test/video.mkv"), filename="video.mkv",
+                               audio_tracks=[{'codec_name': 'ac3'}, {'codec_name': 'aac'}])
+        job = ProcessingJob(
+            input_files=[input_file],
+            output_directory=Path("/test/output"),
+            job_type='extract',
+            settings={'format': 'aac'}
+        )
+        worker = FFmpegWorker(job)
+
+        # Action
+        command = worker.build_extract_audio_cmd(input_file)
+
+        # Assert
+        expected_command = [
+            'ffmpeg', '-i', '/test/video.mkv', '-map', '0:a:0', '-c:a', 'aac',
+            '-y', '/test/output/video.aac'
+        ]
+        self.assertEqual(command, expected_command)
+
     def test_build_merge_command_preserve(self):
         # Setup
         video_file = MediaFile(path=Path("/test/video.mkv"), filename="video.mkv")
@@ -65,8 +122,9 @@ class TestFFmpegWorker(unittest.TestCase):
         # Assert
         expected_command = [
             'ffmpeg', '-i', '/test/video.mkv', '-i', '/test/audio1.aac', '-i', '/test/audio2.mp3',
-            '-map', '0', '-map', '-0:a',
+            '-map', '0', '-map', '-0:a', '-map', '-0:d?',
             '-map', '1:a', '-map', '2:a',
+            '-map_metadata', '0', '-map_chapters', '0',
             '-metadata:s:a:0', 'language=eng', '-metadata:s:a:1', 'language=ger',
             '-c', 'copy', '-y', '/test/output/video_merged.mkv'
         ]
@@ -93,6 +151,7 @@ class TestFFmpegWorker(unittest.TestCase):
             'ffmpeg', '-i', '/test/video.mkv', '-i', '/test/audio1.aac',
             '-map', '0:v', '-map', '0:s?',
             '-map', '1:a',
+            '-map_metadata', '0', '-map_chapters', '0',
             '-metadata:s:a:0', 'language=jpn',
             '-c', 'copy', '-y', '/test/output/video_merged.mkv'
         ]
@@ -121,6 +180,7 @@ class TestFFmpegWorker(unittest.TestCase):
         expected_command = [
             'ffmpeg', '-i', '/test/video.mkv', '-i', '/test/sub1.srt', '-i', '/test/sub2.ass',
             '-map', '0', '-map', '1', '-map', '2',
+            '-map', '-0:d?', '-map_metadata', '0', '-map_chapters', '0',
             '-c', 'copy', '-c:s', 'mov_text',
             '-metadata:s:s:0', 'language=eng', '-metadata:s:s:1', 'language=fre',
             '-disposition:s:0', 'default',
@@ -154,5 +214,233 @@ class TestFFmpegWorker(unittest.TestCase):
         ]
         self.assertEqual(command, expected_command)
 
+    def test_merge_reuses_last_language_for_extra_tracks(self):
+        # Setup
+        video_file = MediaFile(path=Path("/test/Show S01E01.mkv"), filename="Show S01E01.mkv")
+        job = ProcessingJob(
+            input_files=[video_file],
+            output_directory=Path("/test/output"),
+            job_type='merge',
+            settings={
+                'audio_files': ['/test/Show S01E01.eng.ac3', '/test/Show S01E01.jpn.ac3',
+                                '/test/Show S01E01.ger.ac3'],
+                'languages': ['eng', 'jpn']
+            }
+        )
+        worker = FFmpegWorker(job)
+
+        # Action
+        with patch.object(FFmpegWorker, '_run_tasks') as mock_run:
+            worker.merge_audio()
+
+        # Assert
+        task = mock_run.call_args[0][0][0]
+        self.assertEqual(
+            [arg for arg in task.cmd if arg.startswith('language=')],
+            ['language=eng', 'language=jpn', 'language=jpn']
+        )
+
+    def _make_fake_ffmpeg(self, tmpdir, exit_code=0):
+        """Writes a shell script standing in for ffmpeg that logs its arguments."""
+        script = Path(tmpdir) / "ffmpeg"
+        script.write_text(
+            "#!/bin/sh\n"
+            f'echo "$@" >> "{tmpdir}/calls.txt"\n'
+            "echo out_time_us=5000000\n"
+            "echo progress=end\n"
+            "echo 'Conversion failed!' >&2\n"
+            f"exit {exit_code}\n"
+        )
+        script.chmod(0o755)
+        return str(script)
+
+    def _run_extract_job(self, tmpdir, input_files, exit_code=0, settings=None):
+        job = ProcessingJob(
+            input_files=input_files,
+            output_directory=Path(tmpdir),
+            job_type='extract',
+            settings=settings or {'format': 'aac'}
+        )
+        worker = FFmpegWorker(job)
+        worker.ffmpeg_path = self._make_fake_ffmpeg(tmpdir, exit_code)
+        results = []
+        progress = []
+        worker.job_completed.connect(lambda message, success: results.append((message, success)))
+        worker.progress_updated.connect(progress.append)
+        worker.extract_audio()
+        calls = (Path(tmpdir) / "calls.txt").read_text().splitlines()
+        return results, progress, calls
+
+    def test_extract_runs_every_file_concurrently(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Setup
+            input_files = [
+                MediaFile(path=Path(f"/test/video{i}.mkv"), filename=f"video{i}.mkv", duration=10.0,
+                          audio_tracks=[{'codec_name': 'aac'}])
+                for i in range(4)
+            ]
+
+            # Action
+            results, progress, calls = self._run_extract_job(
+                tmpdir, input_files, settings={'format': 'aac', 'max_threads': 2})
+
+            # Assert
+            self.assertEqual(len(calls), 4)
+            for call in calls:
+                self.assertTrue(call.startswith("-progress pipe:1 -nostdin -hide_banner -nostats -loglevel error"))
+            self.assertEqual(results, [("Audio extraction completed!", True)])
+            self.assertIn(50, progress)
+            self.assertEqual(progress[-1], 100)
+
+    def test_task_without_duration_skips_progress_pipe(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Setup
+            input_files = [MediaFile(path=Path("/test/video.mkv"), filename="video.mkv",
+                                     audio_tracks=[{'codec_name': 'aac'}])]
+
+            # Action
+            with patch.object(FFmpegWorker, '_get_duration', return_value=0.0):
+                results, _, calls = self._run_extract_job(tmpdir, input_files)
+
+            # Assert
+            self.assertEqual(len(calls), 1)
+            self.assertNotIn('-progress', calls[0])
+            self.assertEqual(results, [("Audio extraction completed!", True)])
+
+    def test_failed_task_reports_ffmpeg_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Setup
+            input_files = [MediaFile(path=Path("/test/video.mkv"), filename="video.mkv", duration=10.0,
+                                     audio_tracks=[{'codec_name': 'aac'}])]
+
+            # Action
+            results, _, _ = self._run_extract_job(tmpdir, input_files, exit_code=1)
+
+            # Assert
+            self.assertEqual(results, [("Failed to extract from video.mkv.\nConversion failed!", False)])
+
+    def test_extract_season_episode_and_build_filename(self):
+        # Setup
+        job = ProcessingJob(input_files=[], output_directory=Path(), job_type='rename', settings={})
+        worker = FFmpegWorker(job)
+
+        # Action
+        season, episode = worker.extract_season_episode("show.1x05.mkv")
+        new_name = worker.build_new_filename(
+            'Show: Name (2008)', season, episode, 'Who?', '.mkv',
+            {'filename_template': '{name} - S{season:02d}E{episode:02d} - {title} [{year}]{ext}'}
+        )
+
+        # Assert
+        self.assertEqual((season, episode), (1, 5))
+        self.assertEqual(new_name, 'Show Name (2008) - S01E05 - Who [2008].mkv')
+
+    def test_episode_title_lookups_are_memoized(self):
+        # Setup
+        job = ProcessingJob(input_files=[], output_directory=Path(), job_type='rename', settings={})
+        worker = FFmpegWorker(job)
+
+        # Action
+        with patch.object(FFmpegWorker, '_fetch_episode_title', return_value="Pilot") as mock_fetch:
+            titles = [worker.get_episode_title("Show", 1, 1) for _ in range(3)]
+            worker.get_episode_title("Show", 1, 2)
+
+        # Assert
+        self.assertEqual(titles, ["Pilot"] * 3)
+        self.assertEqual(mock_fetch.call_count, 2)
+
+    def test_bulk_rename_renames_files_in_place(self):
+        # Setup
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original = Path(tmpdir) / "show.s01e02.mkv"
+            original.touch()
+            job = ProcessingJob(
+                input_files=[MediaFile(path=original, filename=original.name)],
+                output_directory=Path(),
+                job_type='rename',
+                settings={'show_name': 'Show', 'filename_template': '{name} - S{season:02d}E{episode:02d}{ext}'}
+            )
+            worker = FFmpegWorker(job)
+
+            # Action
+            worker.bulk_rename()
+
+            # Assert
+            self.assertFalse(original.exists())
+            self.assertTrue((Path(tmpdir) / "Show - S01E02.mkv").exists())
+
+    def test_media_analysis_worker_reports_every_file(self):
+        # Setup
+        infos = {'/test/a.mkv': {'format': {'duration': '12.5'}}, '/test/b.mkv': None}
+        analyzer = MediaAnalysisWorker(['/test/a.mkv', '/test/b.mkv'])
+        results = []
+        analyzer.files_analyzed.connect(results.append)
+
+        # Action
+        with patch('echomux.utils.analyze_media_file', side_effect=infos.get):
+            analyzer.start()
+            analyzer.wait()
+        QCoreApplication.processEvents()
+
+        # Assert
+        self.assertEqual(results, [[('/test/a.mkv', infos['/test/a.mkv']), ('/test/b.mkv', None)]])
+
+    def test_media_analysis_worker_reports_in_batches(self):
+        # Setup
+        paths = [f'/test/{i}.mkv' for i in range(5)]
+        analyzer = MediaAnalysisWorker(paths)
+        analyzer.BATCH_SIZE = 2
+        results = []
+        analyzer.files_analyzed.connect(results.append)
+
+        # Action
+        with patch('echomux.utils.analyze_media_file', return_value=None):
+            analyzer.start()
+            analyzer.wait()
+        QCoreApplication.processEvents()
+
+        # Assert
+        self.assertEqual([len(batch) for batch in results], [2, 2, 1])
+        self.assertEqual([path for batch in results for path, _ in batch], paths)
+
+    def test_media_analysis_worker_stops_when_interrupted(self):
+        # Setup
+        paths = [f'/test/{i}.mkv' for i in range(5)]
+        analyzer = MediaAnalysisWorker(paths)
+        analyzer.BATCH_SIZE = 2
+        results = []
+        analyzer.files_analyzed.connect(results.append)
+
+        def probe(path):
+            analyzer.requestInterruption()
+            return None
+
+        # Action
+        with patch('echomux.utils.analyze_media_file', side_effect=probe):
+            analyzer.start()
+            analyzer.wait()
+        QCoreApplication.processEvents()
+
+        # Assert
+        self.assertEqual([len(batch) for batch in results], [2])
+
+    def test_episode_title_worker_reports_titles(self):
+        # Setup
+        api_client = MagicMock()
+        api_client.search_show.return_value.id = 123
+        api_client.get_episode_titles_bulk.return_value = {(1, 1): 'The Pilot', (1, 2): None}
+        title_worker = EpisodeTitleWorker(api_client, 'Test Show', [(1, 1), (1, 2)])
+        results = []
+        title_worker.titles_ready.connect(lambda show_name, titles: results.append((show_name, titles)))
+
+        # Action
+        title_worker.start()
+        title_worker.wait()
+        QCoreApplication.processEvents()
+
+        # Assert
+        self.assertEqual(results, [('Test Show', {(1, 1): 'The Pilot', (1, 2): None})])
+        api_client.get_episode_titles_bulk.assert_called_once_with(123, [(1, 1), (1, 2)])
+
 if __name__ == '__main__':
     unittest.main()